@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# Read once: the umask can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+@contextmanager
+def atomic_output(filename, mode='wb'):
+    """
+    Open a temporary file that replaces filename when the block completes.
+
+    The temporary file is created next to the target and renamed over it, so
+    readers never see a partially written file and a failure leaves the
+    target untouched. A symlinked target is written through (the link is
+    kept), an existing target keeps its permission bits, and a new file gets
+    the permissions open() would have given it.
+
+    :param filename: The final filename.
+    :param mode: 'wb' for binary output or 'w' for text output.
+    :return: The temporary file object to write to.
+    """
+    filename = os.path.realpath(filename)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filename), prefix='.boompdf-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as output_file:
+            yield output_file
+        if os.path.exists(filename):
+            shutil.copymode(filename, temp_path)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+        os.replace(temp_path, filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
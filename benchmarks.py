@@ -0,0 +1,579 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import tempfile
+import time
+from importlib import metadata
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+)
+
+from pdf_async import AsyncPDFOperations
+from pdf_fingerprint import FingerprintIndex
+from pdf_procedures import PDFOperations
+
+def make_sample_pdf(path, num_pages, text="Sample page", image_size=0):
+    """
+    Generate a synthetic PDF file.
+
+    :param path: Filename to write the generated PDF to.
+    :param num_pages: Number of pages to generate.
+    :param text: Text drawn on every page (followed by the page number).
+    :param image_size: Side in pixels of a random, uncompressed grayscale image
+        drawn on every page (0 generates text-only pages).
+    :return: The path of the generated PDF.
+    """
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for page_number in range(1, num_pages + 1):
+        page = writer.add_blank_page(width=612, height=792)
+        content = DecodedStreamObject()
+        operators = f"BT /F1 24 Tf 72 700 Td ({text} {page_number}) Tj ET"
+        resources = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        if image_size:
+            image = DecodedStreamObject()
+            image.set_data(os.urandom(image_size * image_size))
+            image.update({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(image_size),
+                NameObject("/Height"): NumberObject(image_size),
+                NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+            })
+            resources[NameObject("/XObject")] = DictionaryObject({NameObject("/Im1"): writer._add_object(image)})
+            operators += " q 468 0 0 468 72 172 cm /Im1 Do Q"
+        content.set_data(operators.encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = resources
+    with open(path, 'wb') as output_file:
+        writer.write(output_file)
+    return path
+
+def benchmark_merge(file_counts=(25, 50, 100, 200), pages_per_file=5):
+    """
+    Time merge_pdf_files for a growing number of inputs.
+
+    The time per input file should stay roughly constant, i.e. the total merge
+    time grows linearly with the number of inputs.
+
+    :param file_counts: Numbers of input files to merge.
+    :param pages_per_file: Pages in every generated input file.
+    :return: A list of (file_count, seconds) tuples.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        sample = make_sample_pdf(os.path.join(work_dir, "sample.pdf"), pages_per_file)
+        inputs = []
+        for index in range(max(file_counts)):
+            inputs.append(shutil.copyfile(sample, os.path.join(work_dir, f"input_{index}.pdf")))
+        for file_count in file_counts:
+            pdf_operations = PDFOperations()
+            pdf_operations.select_pdf_files(inputs[:file_count])
+            output_filename = os.path.join(work_dir, f"merged_{file_count}.pdf")
+
+            start = time.perf_counter()
+            pdf_operations.merge_pdf_files(output_filename)
+            elapsed = time.perf_counter() - start
+
+            results.append((file_count, elapsed))
+            print(f"merge {file_count:>5} files: {elapsed:8.3f}s ({elapsed / file_count * 1000:.2f} ms/file)")
+    return results
+
+def benchmark_convert(num_pages=300, workers=(1, max(2, os.cpu_count() or 1))):
+    """
+    Compare single-process and sharded convert_pdf_to_word on a generated document.
+
+    :param num_pages: Pages in the generated document.
+    :param workers: Worker counts to time (1 converts in-process).
+    :return: A list of (workers, seconds) tuples.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = make_sample_pdf(os.path.join(work_dir, "report.pdf"), num_pages)
+        pdf_operations = PDFOperations()
+        pdf_operations.select_pdf_files(pdf_path)
+        for worker_count in workers:
+            docx_path = os.path.join(work_dir, f"report_{worker_count}.docx")
+
+            start = time.perf_counter()
+            pdf_operations.convert_pdf_to_word(pdf_path, docx_path, workers=worker_count)
+            elapsed = time.perf_counter() - start
+
+            results.append((worker_count, elapsed))
+            print(f"convert {num_pages} pages with {worker_count:>2} worker(s): {elapsed:8.3f}s")
+    return results
+
+def _extract_peak_rss(pdf_path, output_filename, low_memory):
+    # Runs in a fresh process so ru_maxrss only reflects this extraction
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pdf_operations = PDFOperations(cache_max_entries=0)
+    pdf_operations.select_pdf_files(pdf_path)
+    pdf_operations.extract_pdf_pages(pdf_path, "1-", output_filename, low_memory=low_memory, return_writer=False)
+    return baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def benchmark_memory(num_pages=400, image_size=512):
+    """
+    Report peak RSS of extracting every page of a large, image-heavy PDF with
+    and without low-memory mode.
+
+    :param num_pages: Pages in the generated document.
+    :param image_size: Side in pixels of the uncompressed image on every page.
+    :return: A list of (low_memory, file_size, peak_rss_bytes) tuples.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = make_sample_pdf(os.path.join(work_dir, "drawings.pdf"), num_pages, image_size=image_size)
+        file_size = os.path.getsize(pdf_path)
+        context = multiprocessing.get_context('spawn')
+        for low_memory in (False, True):
+            output_filename = os.path.join(work_dir, f"extracted_{low_memory}.pdf")
+            with context.Pool(1) as pool:
+                baseline, peak = pool.apply(_extract_peak_rss, (pdf_path, output_filename, low_memory))
+            # ru_maxrss is reported in kilobytes on Linux
+            results.append((low_memory, file_size, peak * 1024))
+            print(f"extract {file_size / 2**20:.0f} MB, low_memory={low_memory!s:<5}: "
+                  f"peak RSS {peak / 1024:.0f} MB (baseline {baseline / 1024:.0f} MB)")
+    return results
+
+async def _measure_loop_lag(stop, interval=0.01):
+    # Sleep repeatedly and record how late the event loop wakes us up
+    lags = []
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - start - interval)
+    return lags
+
+async def _call_every_async_method(async_operations, pdf_path, work_dir):
+    # One call of every operation; results must come back across the executor boundary
+    prefix = os.path.join(work_dir, f"{'processes' if async_operations.use_processes else 'threads'}_")
+    edited = {name: shutil.copyfile(pdf_path, f"{prefix}{name}.pdf") for name in ('delete', 'insert', 'rotate')}
+    async_operations.select_pdf_files(list(edited.values()))
+    split_dir = f"{prefix}split"
+    os.makedirs(split_dir, exist_ok=True)
+    calls = {
+        'extract': async_operations.extract_pdf_pages(pdf_path, "1-2", f"{prefix}extracted.pdf"),
+        'merge': async_operations.merge_pdf_files(f"{prefix}merged.pdf"),
+        'split': async_operations.split_pdf(pdf_path, every=10, output_dir=split_dir),
+        'delete': async_operations.delete_pdf_pages(edited['delete'], 1),
+        'insert': async_operations.insert_into_pdf(edited['insert'], pdf_path, 1, 1),
+        'rotate': async_operations.rotate_pdf_pages(edited['rotate'], 1, 90),
+        'convert': async_operations.convert_pdf_to_word(pdf_path, f"{prefix}converted.docx", 1),
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = await asyncio.gather(*calls.values())
+    failed = [name for name, result in zip(calls, results) if result is None]
+    if failed:
+        raise RuntimeError(f"Async operations failed: {', '.join(failed)}")
+
+async def _async_latency_run(pdf_path, work_dir, conversions, use_processes):
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_loop_lag(stop))
+    start = time.perf_counter()
+    if conversions:
+        async with AsyncPDFOperations(max_workers=2, use_processes=use_processes) as async_operations:
+            async_operations.select_pdf_files(pdf_path)
+            await asyncio.gather(*(
+                async_operations.convert_pdf_to_word(pdf_path, os.path.join(work_dir, f"load_{i}.docx"))
+                for i in range(conversions)
+            ))
+            await _call_every_async_method(async_operations, pdf_path, work_dir)
+    else:
+        await asyncio.sleep(1)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return sorted(await ticker), elapsed
+
+def benchmark_async_latency(num_pages=50, conversions=4):
+    """
+    Measure event-loop latency while AsyncPDFOperations runs conversions.
+
+    An idle loop is compared with a loop awaiting conversions on worker
+    threads and on worker processes; the lag percentiles should stay close
+    to the idle ones. Every other operation is then called once in each
+    mode, to check that its result comes back from the workers.
+
+    :param num_pages: Pages in the generated document.
+    :param conversions: Number of concurrent conversions.
+    :return: A dictionary mapping the scenario to (p50, p99, max) lag in seconds.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = make_sample_pdf(os.path.join(work_dir, "load.pdf"), num_pages)
+        scenarios = (('idle', 0, False), ('threads', conversions, False), ('processes', conversions, True))
+        for name, count, use_processes in scenarios:
+            lags, elapsed = asyncio.run(_async_latency_run(pdf_path, work_dir, count, use_processes))
+            p50, p99, worst = lags[len(lags) // 2], lags[int(len(lags) * 0.99)], lags[-1]
+            results[name] = (p50, p99, worst)
+            print(f"event loop lag, {name:<9} ({elapsed:6.2f}s): "
+                  f"p50 {p50 * 1000:6.2f} ms, p99 {p99 * 1000:6.2f} ms, max {worst * 1000:6.2f} ms")
+    return results
+
+def benchmark_optimize(file_count=200, pages_per_file=2, image_size=128):
+    """
+    Compare the size and time of merging statements that share the same images
+    with and without output optimization.
+
+    :param file_count: Number of input files to merge.
+    :param pages_per_file: Pages in every generated input file.
+    :param image_size: Side in pixels of the image shared by the inputs.
+    :return: A list of (optimize, output_size, seconds) tuples.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        sample = make_sample_pdf(os.path.join(work_dir, "statement.pdf"), pages_per_file, image_size=image_size)
+        inputs = [shutil.copyfile(sample, os.path.join(work_dir, f"statement_{index}.pdf")) for index in range(file_count)]
+        for optimize in (False, True):
+            pdf_operations = PDFOperations(optimize=optimize, compress_level=6 if optimize else None)
+            pdf_operations.select_pdf_files(inputs)
+            output_filename = os.path.join(work_dir, f"merged_{optimize}.pdf")
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                pdf_operations.merge_pdf_files(output_filename)
+            elapsed = time.perf_counter() - start
+
+            output_size = os.path.getsize(output_filename)
+            results.append((optimize, output_size, elapsed))
+            print(f"merge {file_count} statements, optimize={optimize!s:<5}: {output_size / 2**20:8.2f} MB in {elapsed:.3f}s")
+    return results
+
+def benchmark_incremental(num_pages=1500, image_size=64):
+    """
+    Compare rotating a single page of a large document by rewriting it and by
+    appending an incremental update.
+
+    :param num_pages: Pages in the generated document.
+    :param image_size: Side in pixels of the image on every page.
+    :return: A list of (incremental, bytes_written, seconds) tuples.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        original = make_sample_pdf(os.path.join(work_dir, "original.pdf"), num_pages, image_size=image_size)
+        for incremental in (False, True):
+            pdf_path = shutil.copyfile(original, os.path.join(work_dir, f"edited_{incremental}.pdf"))
+            pdf_operations = PDFOperations()
+            pdf_operations.select_pdf_files(pdf_path)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                pdf_operations.rotate_pdf_pages(pdf_path, num_pages // 2, 90, incremental=incremental)
+            elapsed = time.perf_counter() - start
+
+            bytes_written = pdf_operations.instrumentation.last_record['bytes_written']
+            results.append((incremental, bytes_written, elapsed))
+            print(f"rotate 1 of {num_pages} pages ({os.path.getsize(original) / 2**20:.1f} MB), "
+                  f"incremental={incremental!s:<5}: {bytes_written:>10} bytes written in {elapsed:.3f}s")
+    return results
+
+def benchmark_fingerprint_index(file_count=100, pages_per_file=1000, lookups=100000):
+    """
+    Time building, persisting, reloading and querying a page fingerprint index.
+
+    :param file_count: Number of indexed files (copies of one generated document).
+    :param pages_per_file: Pages in every file.
+    :param lookups: Number of fingerprint lookups timed.
+    :return: A dictionary mapping each step to its seconds.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        sample = make_sample_pdf(os.path.join(work_dir, "sample.pdf"), pages_per_file)
+        paths = [shutil.copyfile(sample, os.path.join(work_dir, f"input_{index}.pdf")) for index in range(file_count)]
+        index_path = os.path.join(work_dir, "page_index.json")
+
+        start = time.perf_counter()
+        index = FingerprintIndex(index_path)
+        index.update(paths)
+        results['build'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.save()
+        results['save'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = FingerprintIndex(index_path)
+        index.update(paths) # Unchanged files are only stat'ed
+        results['reload'] = time.perf_counter() - start
+
+        fingerprints = index.get_fingerprints(paths[0])
+        start = time.perf_counter()
+        for lookup in range(lookups):
+            index.lookup(fingerprints[lookup % len(fingerprints)])
+        results['lookup'] = (time.perf_counter() - start) / lookups
+
+        start = time.perf_counter()
+        duplicates = index.find_duplicates()
+        results['find_duplicates'] = time.perf_counter() - start
+
+        print(f"fingerprint index of {len(index)} pages ({os.path.getsize(index_path) / 2**20:.1f} MB on disk): "
+              f"build {results['build']:.2f}s, save {results['save']:.2f}s, reload {results['reload']:.2f}s, "
+              f"lookup {results['lookup'] * 1e6:.1f} us, {len(duplicates)} duplicate groups in {results['find_duplicates']:.2f}s")
+    return results
+
+# Synthetic fixtures for the suite: name -> (file_count, pages_per_file, image_size, convert)
+FIXTURES = {
+    'text_small': (1, 10, 0, True),
+    'text_large': (1, 500, 0, False),
+    'images': (1, 40, 256, True),
+    'many_small': (200, 2, 0, False),
+    'few_huge': (2, 150, 512, False),
+}
+
+def make_fixture(work_dir, name, scale=1.0):
+    """
+    Generate the files of a suite fixture.
+
+    Files of a multi-file fixture are copies of one generated file, so they
+    are distinct on disk but cheap to create.
+
+    :param work_dir: Directory to generate the files in.
+    :param name: One of FIXTURES.
+    :param scale: Factor applied to the file and page counts (e.g. 0.1 for a quick run).
+    :return: List of the generated file paths.
+    """
+    file_count, pages_per_file, image_size, _ = FIXTURES[name]
+    file_count = max(1, round(file_count * scale))
+    pages_per_file = max(2, round(pages_per_file * scale))
+    sample = make_sample_pdf(os.path.join(work_dir, f"{name}_0.pdf"), pages_per_file, image_size=image_size)
+    paths = [sample]
+    for index in range(1, file_count):
+        paths.append(shutil.copyfile(sample, os.path.join(work_dir, f"{name}_{index}.pdf")))
+    return paths
+
+def _suite_calls(paths, work_dir, convert):
+    # (method name, setup, call) for every timed PDFOperations method; setup runs untimed,
+    # call returns None when the operation failed
+    pdf_path = paths[0]
+    output = os.path.join(work_dir, "output.pdf")
+    edited = os.path.join(work_dir, "edited.pdf")
+    split_dir = os.path.join(work_dir, "split")
+    os.makedirs(split_dir, exist_ok=True)
+
+    def copy_input():
+        shutil.copyfile(pdf_path, edited)
+
+    def edit_plan(ops):
+        ops.select_pdf_files(edited)
+        return ops.plan_edits(edited).delete(1).rotate(1, 90).commit()
+
+    def select(ops):
+        ops.select_pdf_files(paths)
+        return ops.get_selected_files() or None
+
+    calls = [
+        ('select_pdf_files', None, select),
+        ('extract_pdf_pages', None, lambda ops: ops.extract_pdf_pages(pdf_path, "1-", output, return_writer=False)),
+        ('extract_pdf_pages[low_memory]', None, lambda ops: ops.extract_pdf_pages(pdf_path, "1-", output, low_memory=True)),
+        ('merge_pdf_files', None, lambda ops: ops.merge_pdf_files(output)),
+        ('split_pdf', None, lambda ops: ops.split_pdf(pdf_path, every=10, output_dir=split_dir)),
+        ('delete_pdf_pages', None, lambda ops: ops.delete_pdf_pages(pdf_path, 1, output=output)),
+        ('insert_into_pdf', None, lambda ops: ops.insert_into_pdf(pdf_path, pdf_path, 1, 1, output=output)),
+        ('rotate_pdf_pages', None, lambda ops: ops.rotate_pdf_pages(pdf_path, 1, 90, output=output)),
+        ('plan_edits', copy_input, edit_plan),
+    ]
+    if convert:
+        calls.append(('convert_pdf_to_word', None,
+                      lambda ops: ops.convert_pdf_to_word(pdf_path, os.path.join(work_dir, "output.docx"))))
+    return calls
+
+def run_suite(fixtures=None, repeat=3, scale=1.0):
+    """
+    Time every PDFOperations method on every synthetic fixture.
+
+    Every run uses a fresh PDFOperations with the reader cache disabled, so
+    each call pays for parsing its inputs. The median of the runs is kept,
+    together with the instrumentation spans and counters of the median run.
+
+    :param fixtures: Names of the FIXTURES to run (all by default).
+    :param repeat: Number of timed runs of every method.
+    :param scale: Factor applied to the fixtures' file and page counts.
+    :return: A dictionary with the run's metadata and a 'results' dictionary
+        mapping "fixture/method" to its seconds, runs, spans, bytes_written and pages,
+        or to an 'error' message if the method failed.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in fixtures or FIXTURES:
+            fixture_dir = os.path.join(work_dir, name)
+            os.makedirs(fixture_dir)
+            paths = make_fixture(fixture_dir, name, scale)
+            for method, setup, call in _suite_calls(paths, fixture_dir, FIXTURES[name][3]):
+                runs = []
+                error = None
+                for _ in range(repeat):
+                    if setup is not None:
+                        setup()
+                    pdf_operations = PDFOperations(cache_max_entries=0)
+                    if method != 'select_pdf_files':
+                        pdf_operations.select_pdf_files(paths)
+                    messages = io.StringIO()
+                    with contextlib.redirect_stdout(messages):
+                        start = time.perf_counter()
+                        result = call(pdf_operations)
+                        elapsed = time.perf_counter() - start
+                    if result is None:
+                        # The operation failed and only printed why: its timing is not a result
+                        lines = messages.getvalue().splitlines()
+                        error = lines[-1] if lines else "The operation returned None."
+                        break
+                    runs.append((elapsed, pdf_operations.instrumentation.last_record or {}))
+                if error is not None:
+                    results[f"{name}/{method}"] = {'error': error}
+                    print(f"{name + '/' + method:<45}    FAILED: {error}")
+                    continue
+                seconds = statistics.median_low(elapsed for elapsed, _ in runs)
+                record = next(record for elapsed, record in runs if elapsed == seconds)
+                results[f"{name}/{method}"] = {
+                    'seconds': seconds,
+                    'runs': [elapsed for elapsed, _ in runs],
+                    'spans': record.get('spans', {}),
+                    'bytes_written': record.get('bytes_written', 0),
+                    'pages': record.get('pages', 0),
+                }
+                print(f"{name + '/' + method:<45} {seconds:9.4f}s")
+    return {'metadata': _suite_metadata(repeat, scale), 'results': results}
+
+def _suite_metadata(repeat, scale):
+    versions = {}
+    for package in ('pypdf', 'pdf2docx', 'PyMuPDF'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': versions,
+        'repeat': repeat,
+        'scale': scale,
+    }
+
+def save_results(suite_results, path):
+    """
+    Write suite results to a JSON file (e.g. to serve as a baseline).
+
+    :param suite_results: The dictionary returned by run_suite.
+    :param path: Filename of the JSON file.
+    """
+    with open(path, 'w') as output_file:
+        json.dump(suite_results, output_file, indent=2, sort_keys=True)
+
+def compare_to_baseline(suite_results, baseline, threshold=0.2, min_seconds=0.005):
+    """
+    Compare suite results with a baseline and report regressions.
+
+    A benchmark regresses when it is more than threshold slower than in the
+    baseline and the difference exceeds min_seconds, so that the noise of
+    very fast calls is not reported.
+
+    :param suite_results: The dictionary returned by run_suite.
+    :param baseline: A dictionary returned by run_suite, or the filename of a saved one.
+    :param threshold: Allowed slowdown as a fraction (0.2 allows 20%).
+    :param min_seconds: Minimum absolute slowdown reported as a regression.
+    :return: List of (name, baseline_seconds, seconds) tuples of the regressed benchmarks;
+        seconds is None for a benchmark that failed (baseline_seconds is None if it is new or
+        also failed in the baseline).
+    """
+    if not isinstance(baseline, dict):
+        with open(baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    if baseline['metadata'].get('scale') != suite_results['metadata'].get('scale'):
+        print("Warning: the baseline was recorded with a different scale.")
+
+    regressions = []
+    for name, result in suite_results['results'].items():
+        baseline_result = baseline['results'].get(name)
+        before = None if baseline_result is None else baseline_result.get('seconds')
+        if 'error' in result:
+            regressions.append((name, before, None))
+            print(f"{name:<45}    FAILED: {result['error']}")
+            continue
+        if before is None:
+            print(f"{name:<45} {result['seconds']:9.4f}s ({'new' if baseline_result is None else 'failed in the baseline'})")
+            continue
+        after = result['seconds']
+        change = (after - before) / before if before else 0.0
+        regressed = after > before * (1 + threshold) and after - before > min_seconds
+        if regressed:
+            regressions.append((name, before, after))
+        print(f"{name:<45} {before:9.4f}s -> {after:9.4f}s ({change:+7.1%}){'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def benchmark_suite(fixtures=None, repeat=3, scale=1.0, output=None, baseline=None, threshold=0.2):
+    """
+    Run the fixture suite, optionally saving it and comparing it with a baseline.
+
+    :param fixtures: Names of the FIXTURES to run (all by default).
+    :param repeat: Number of timed runs of every method.
+    :param scale: Factor applied to the fixtures' file and page counts.
+    :param output: Filename to save the results to as JSON.
+    :param baseline: Filename of a saved baseline to compare with.
+    :param threshold: Allowed slowdown as a fraction.
+    :return: List of regressions, as returned by compare_to_baseline; without a baseline,
+        only the benchmarks that failed.
+    """
+    suite_results = run_suite(fixtures, repeat, scale)
+    if output:
+        save_results(suite_results, output)
+    if baseline:
+        return compare_to_baseline(suite_results, baseline, threshold)
+    return [(name, None, None) for name, result in suite_results['results'].items() if 'error' in result]
+
+BENCHMARKS = {
+    'merge': benchmark_merge,
+    'convert': benchmark_convert,
+    'memory': benchmark_memory,
+    'async': benchmark_async_latency,
+    'optimize': benchmark_optimize,
+    'incremental': benchmark_incremental,
+    'fingerprint': benchmark_fingerprint_index,
+    'suite': benchmark_suite,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the boomPDF benchmarks.")
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run, among {', '.join(BENCHMARKS)} (all by default).")
+    parser.add_argument('--fixtures', nargs='+', choices=list(FIXTURES), help="Suite fixtures to run.")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs of every suite benchmark.")
+    parser.add_argument('--scale', type=float, default=1.0, help="Scale of the suite fixtures.")
+    parser.add_argument('--output', help="Save the suite results to this JSON file.")
+    parser.add_argument('--baseline', help="Compare the suite results with this JSON file.")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown against the baseline.")
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    regressions = []
+    for name in args.benchmarks or BENCHMARKS:
+        if name == 'suite':
+            regressions = benchmark_suite(args.fixtures, args.repeat, args.scale, args.output, args.baseline, args.threshold)
+        else:
+            BENCHMARKS[name]()
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+import re
+from array import array
+from functools import lru_cache
+from itertools import compress
+
+# One term of a page specification: "7", "-2", "3-9", "20-", "-3-", "1-99:2"
+_TERM = re.compile(r'^\s*(-?\d+)\s*(?:(-)\s*(-?\d+)?)?\s*(?::\s*(\d+))?\s*$')
+
+class PageSelectionError(ValueError):
+    """
+    Raised when a page specification is malformed or selects pages that do not exist.
+
+    :ivar specification: The offending page specification.
+    :ivar invalid_pages: List of (first, last) 1-based spans of pages that are out of range
+        (pages before the first one keep their negative, from-the-end numbering).
+    :ivar total_pages: Number of pages in the document, if known.
+    :ivar reversed_ranges: List of (first, last) 1-based ranges whose last page comes before their first.
+    """
+
+    def __init__(self, message, specification=None, invalid_pages=(), total_pages=None, reversed_ranges=()):
+        super().__init__(message)
+        self.specification = specification
+        self.invalid_pages = list(invalid_pages)
+        self.total_pages = total_pages
+        self.reversed_ranges = list(reversed_ranges)
+
+class PageSelection:
+    """
+    A page specification compiled into a compact list of ranges.
+
+    Supported specifications (page numbers are 1-based):
+
+    * an int: ``3``; negative numbers count from the end, ``-1`` is the last page
+    * a range string: ``"1-5"``, an open range ``"20-"`` or ``"-3-"`` (the last three pages)
+    * a step: ``"1-10:2"`` selects pages 1, 3, 5, 7 and 9
+    * comma-separated terms: ``"1-10,15,20-"``
+    * a list or tuple of any of the above
+
+    Compiling does not need the document; resolve() applies the selection to a
+    document with a given number of pages.
+    """
+
+    __slots__ = ('specification', 'ranges')
+
+    def __init__(self, specification, ranges):
+        """
+        :param specification: The original page specification.
+        :param ranges: Tuple of (start, end, step) terms; end is None for open ranges.
+        """
+        self.specification = specification
+        self.ranges = ranges
+
+    def __repr__(self):
+        return f"PageSelection({self.specification!r})"
+
+    def resolve(self, total_pages, pdf_path=None):
+        """
+        Get the selected pages of a document with total_pages pages.
+
+        :param total_pages: Number of pages in the document.
+        :param pdf_path: Path of the document, used in the error message.
+        :return: An array of sorted, unique 0-based page indices.
+        :raises PageSelectionError: If any selected page is out of range or a range is reversed (e.g. "4-2").
+        """
+        spans = []
+        invalid = []
+        reversed_ranges = []
+        for start, end, step in self.ranges:
+            first = _absolute_page(start, total_pages)
+            last = total_pages if end is None else _absolute_page(end, total_pages)
+            if last < first:
+                if end is None:
+                    invalid.append((first, first)) # Open range starting past the end
+                else:
+                    reversed_ranges.append((first, last))
+                continue
+            # Clip to the document, recording what falls outside it
+            if first < 1:
+                # Report pages before the first one in the from-the-end numbering used to select them
+                invalid.append((first - total_pages - 1, min(last, 0) - total_pages - 1))
+                first += -(-(1 - first) // step) * step
+            if last > total_pages:
+                first_outside = first + max(0, -(-(total_pages + 1 - first) // step)) * step
+                if first_outside <= last:
+                    invalid.append((first_outside, last))
+                last = total_pages
+            if first <= last:
+                spans.append((first - 1, last, step)) # 0-based, half-open
+        if invalid or reversed_ranges:
+            problems = []
+            if invalid:
+                problems.append(f"Page(s) {_format_spans(invalid)} out of range")
+            if reversed_ranges:
+                problems.append(f"reversed range(s) {_format_spans(reversed_ranges)}")
+            message = " and ".join(problems)
+            raise PageSelectionError(
+                f"{message[0].upper()}{message[1:]} for {pdf_path or 'document'} with {total_pages} pages.",
+                self.specification, invalid, total_pages, reversed_ranges)
+        return _spans_to_indices(spans, total_pages)
+
+def compile_page_specifications(page_specifications):
+    """
+    Compile a page specification into a PageSelection.
+
+    String and int specifications are compiled once and cached. Lists are
+    compiled on every call: as cache keys, [True, 2] and [1.0, 2] would
+    compare equal to [1, 2] and skip its validation.
+
+    :param page_specifications: A PageSelection, a single page number, a range string (e.g., "1-5", "20-", "1-10:2", "1-10,15"), or a list of them.
+    :return: A PageSelection.
+    :raises PageSelectionError: If the specification is malformed.
+    """
+    if isinstance(page_specifications, PageSelection):
+        return page_specifications
+    if type(page_specifications) in (str, int):
+        return _compile_cached(page_specifications)
+    if isinstance(page_specifications, list):
+        page_specifications = tuple(page_specifications)
+    return _compile(page_specifications)
+
+@lru_cache(maxsize=256, typed=True)
+def _compile_cached(page_specifications):
+    return _compile(page_specifications)
+
+def _compile(page_specifications):
+    ranges = []
+    _add_terms(page_specifications, ranges, page_specifications)
+    return PageSelection(page_specifications, tuple(ranges))
+
+def _add_terms(specification, ranges, original):
+    if isinstance(specification, bool):
+        raise PageSelectionError(f"Invalid page specification: {original!r}", original)
+    if isinstance(specification, int):
+        if specification == 0:
+            raise PageSelectionError("Page numbers start at 1.", original)
+        ranges.append((specification, specification, 1))
+    elif isinstance(specification, str):
+        for term in specification.split(','):
+            match = _TERM.match(term)
+            if match is None:
+                raise PageSelectionError(f"Invalid page specification: {term.strip()!r}", original)
+            start, is_range, end, step = match.groups()
+            start = int(start)
+            end = (int(end) if end is not None else None) if is_range else start
+            step = int(step) if step is not None else 1
+            if start == 0 or end == 0 or step == 0:
+                raise PageSelectionError(f"Invalid page specification: {term.strip()!r}", original)
+            ranges.append((start, end, step))
+    elif isinstance(specification, tuple):
+        for item in specification:
+            _add_terms(item, ranges, original)
+    else:
+        raise PageSelectionError(f"Invalid page specification: {original!r}", original)
+
+def _absolute_page(page, total_pages):
+    return total_pages + 1 + page if page < 0 else page
+
+def _format_spans(spans):
+    return ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in spans)
+
+def _spans_to_indices(spans, total_pages):
+    if all(step == 1 for _, _, step in spans):
+        # Merge contiguous spans; cost is O(ranges) plus the C-level array fill
+        indices = array('l')
+        merged_end = -1
+        for start, stop, _ in sorted(spans):
+            start = max(start, merged_end)
+            if start < stop:
+                indices.extend(range(start, stop))
+                merged_end = stop
+        return indices
+    # Stepped spans may interleave: mark them on a bitmap with slice assignment
+    bitmap = bytearray(total_pages)
+    for start, stop, step in spans:
+        bitmap[start:stop:step] = b'\x01' * len(range(start, stop, step))
+    return array('l', compress(range(total_pages), bitmap))
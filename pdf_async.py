@@ -0,0 +1,191 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfWriter
+
+from pdf_instrumentation import Instrumentation
+from pdf_procedures import PDFOperations
+from pdf_registry import FileRegistry
+
+_worker_state = threading.local()
+
+def _call_in_worker(registry, cache_limits, instrumentation, method_name, args, kwargs):
+    """
+    Call a PDFOperations method on the calling worker's own instance.
+
+    Every worker thread (or process) keeps one PDFOperations, and with it one
+    reader cache, since parsed readers must not be shared between threads.
+
+    :param registry: The FileRegistry of files selected on the facade.
+    :param cache_limits: (max_entries, max_bytes) of the worker's reader cache.
+    :param instrumentation: The facade's Instrumentation (a copy of it in worker processes).
+    :param method_name: Name of the PDFOperations method to call.
+    :param args: Positional arguments of the call.
+    :param kwargs: Keyword arguments of the call.
+    :return: Whatever the method returns.
+    """
+    pdf_operations = getattr(_worker_state, 'pdf_operations', None)
+    if pdf_operations is None:
+        pdf_operations = _worker_state.pdf_operations = PDFOperations(*cache_limits)
+    pdf_operations.registry = registry
+    pdf_operations.instrumentation = instrumentation
+    return getattr(pdf_operations, method_name)(*args, **kwargs)
+
+def _edit_in_worker(output, registry, cache_limits, instrumentation, method_name, args, kwargs):
+    """
+    Call a PDFOperations editing method in a worker process.
+
+    The PdfWriter the method returns cannot be sent back to the parent
+    process, so the filename it was written to is returned instead.
+
+    :param output: The filename the edit is written to.
+    :return: output if the method returned a PdfWriter, otherwise whatever it returned.
+    """
+    result = _call_in_worker(registry, cache_limits, instrumentation, method_name, args, kwargs)
+    return output if isinstance(result, PdfWriter) else result
+
+class AsyncPDFOperations:
+    """
+    Awaitable facade over PDFOperations for use from an asyncio event loop.
+
+    Every operation runs on a bounded executor, so blocking file I/O and CPU
+    work never run on the event loop. At most max_concurrency operations are
+    submitted at a time; the rest wait on a semaphore without holding an
+    executor slot. Cancelling an awaiting operation drops it if it has not
+    started yet; an operation already running in a worker finishes in the
+    background and its result is discarded.
+    """
+
+    def __init__(self, max_workers=4, max_concurrency=None, use_processes=False,
+                 cache_max_entries=16, cache_max_bytes=256 * 1024 * 1024, instrumentation=None):
+        """
+        :param max_workers: Number of executor workers.
+        :param max_concurrency: Maximum number of operations submitted at once (defaults to max_workers).
+        :param use_processes: Run operations in worker processes instead of threads, so that
+            CPU-heavy conversions do not compete with the event loop for the GIL.
+        :param cache_max_entries: Maximum number of parsed documents in each worker's reader cache.
+        :param cache_max_bytes: Maximum total size in bytes of each worker's reader cache.
+        :param instrumentation: Instrumentation receiving a record for every operation. In process
+            mode its hooks must be picklable and run in the worker processes.
+        """
+        self.registry = FileRegistry()
+        self.use_processes = use_processes
+        self.max_concurrency = max_concurrency or max_workers
+        self.cache_limits = (cache_max_entries, cache_max_bytes)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self.max_workers = max_workers
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = executor_class(max_workers=max_workers)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Shut the executor down, cancelling operations that have not started.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def select_pdf_files(self, paths):
+        """
+        Select PDF files by specifying their paths.
+
+        :param paths: A single path or a list of paths to PDF files.
+        """
+        if isinstance(paths, (str, os.PathLike)) or not isinstance(paths, (list, tuple)):
+            paths = [paths]
+        # Copy on write: operations already submitted keep the registry they were given
+        registry = self.registry.copy()
+        for path in registry.add_many(paths):
+            print(f"Invalid PDF file: {path}")
+        self.registry = registry
+
+    def get_selected_files(self):
+        """
+        Get the list of selected PDF file paths.
+
+        :return: List of selected PDF file paths.
+        """
+        return list(self.registry)
+
+    async def extract_pdf_pages(self, pdf_path, page_specifications, output_filename, **kwargs):
+        """
+        Awaitable PDFOperations.extract_pdf_pages. In process mode the output
+        filename is returned instead of the PdfWriter.
+        """
+        if self.use_processes:
+            kwargs['return_writer'] = False
+        return await self._run('extract_pdf_pages', pdf_path, page_specifications, output_filename, **kwargs)
+
+    async def merge_pdf_files(self, output_filename):
+        """
+        Awaitable PDFOperations.merge_pdf_files.
+        """
+        return await self._run('merge_pdf_files', output_filename)
+
+    async def split_pdf(self, pdf_path, **kwargs):
+        """
+        Awaitable PDFOperations.split_pdf.
+        """
+        return await self._run('split_pdf', pdf_path, **kwargs)
+
+    async def delete_pdf_pages(self, pdf_path, page_specifications, **kwargs):
+        """
+        Awaitable PDFOperations.delete_pdf_pages. In process mode the output
+        filename is returned instead of the PdfWriter.
+        """
+        return await self._run_edit(kwargs.get('output') or pdf_path, 'delete_pdf_pages', pdf_path, page_specifications, **kwargs)
+
+    async def insert_into_pdf(self, target_pdf_path, source_pdf_path, page_number, insert_position, **kwargs):
+        """
+        Awaitable PDFOperations.insert_into_pdf. In process mode the output
+        filename is returned instead of the PdfWriter.
+        """
+        return await self._run_edit(kwargs.get('output') or target_pdf_path, 'insert_into_pdf',
+                                    target_pdf_path, source_pdf_path, page_number, insert_position, **kwargs)
+
+    async def rotate_pdf_pages(self, pdf_path, page_specifications, angle, **kwargs):
+        """
+        Awaitable PDFOperations.rotate_pdf_pages. In process mode the output
+        filename is returned instead of the PdfWriter.
+        """
+        return await self._run_edit(kwargs.get('output') or pdf_path, 'rotate_pdf_pages', pdf_path, page_specifications, angle, **kwargs)
+
+    async def convert_pdf_to_word(self, pdf_path, docx_path, page_specifications=None, **kwargs):
+        """
+        Awaitable PDFOperations.convert_pdf_to_word.
+        """
+        return await self._run('convert_pdf_to_word', pdf_path, docx_path, page_specifications, **kwargs)
+
+    async def _run(self, method_name, *args, **kwargs):
+        return await self._submit(functools.partial(_call_in_worker, self.registry, self.cache_limits,
+                                                    self.instrumentation, method_name, args, kwargs))
+
+    async def _run_edit(self, edited_file, method_name, /, *args, **kwargs):
+        # Positional-only, as the method's own keyword arguments include output
+        if not self.use_processes:
+            return await self._run(method_name, *args, **kwargs)
+        return await self._submit(functools.partial(_edit_in_worker, edited_file, self.registry, self.cache_limits,
+                                                    self.instrumentation, method_name, args, kwargs))
+
+    async def _submit(self, call):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            executor = self.executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, call)
+            except BrokenProcessPool:
+                # A dead worker process breaks the pool for good: start a new one for later calls
+                if self.executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                raise
@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pdf_procedures import PDFOperations
+from pdf_registry import expand_paths as registry_expand_paths
+
+OPERATIONS = ('extract', 'delete', 'rotate', 'convert')
+
+def expand_paths(paths):
+    """
+    Expand glob patterns, directories and plain paths into a sorted list of unique files.
+
+    Expansion follows PDFOperations.select_pdf_files (see pdf_registry.expand_paths).
+    A pattern that matches nothing is kept as is, so it is reported as an
+    error instead of silently dropped.
+
+    :param paths: A single path, directory or glob pattern, or a list of them.
+    :return: List of file paths.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    expanded, unmatched = registry_expand_paths(paths)
+    return sorted(set(expanded) | set(unmatched))
+
+def output_path_for(pdf_path, operation, output_dir=None):
+    """
+    Get the output filename an operation writes for a given input.
+
+    :param pdf_path: Path to the input PDF file.
+    :param operation: One of OPERATIONS.
+    :param output_dir: Directory for outputs (defaults to the input's directory).
+    :return: The output filename, or the input itself for in-place operations.
+    """
+    if operation in ('delete', 'rotate'):
+        return pdf_path
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    directory = output_dir if output_dir is not None else os.path.dirname(pdf_path)
+    if operation == 'extract':
+        return os.path.join(directory, f"{stem}_extracted.pdf")
+    return os.path.join(directory, f"{stem}.docx")
+
+def run_operation(pdf_path, operation, options, output_dir=None):
+    """
+    Run one operation on one file and describe the outcome.
+
+    Messages the operation prints are captured into the record instead of
+    being written to stdout.
+
+    :param pdf_path: Path to the PDF file.
+    :param operation: One of OPERATIONS.
+    :param options: Dictionary of operation arguments (page_specifications, angle).
+    :param output_dir: Directory for outputs of extract and convert.
+    :return: A result record with path, operation, output, ok, error, messages and seconds.
+    """
+    record = {'path': pdf_path, 'operation': operation, 'output': None, 'ok': False, 'error': None}
+    pdf_operations = PDFOperations(cache_max_entries=0)
+    messages = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(messages):
+            pdf_operations.select_pdf_files(pdf_path)
+            output = output_path_for(pdf_path, operation, output_dir)
+            page_specifications = options.get('page_specifications')
+            if operation == 'extract':
+                result = pdf_operations.extract_pdf_pages(pdf_path, page_specifications, output)
+            elif operation == 'delete':
+                result = pdf_operations.delete_pdf_pages(pdf_path, page_specifications)
+            elif operation == 'rotate':
+                result = pdf_operations.rotate_pdf_pages(pdf_path, page_specifications, options.get('angle', 90))
+            elif operation == 'convert':
+                result = pdf_operations.convert_pdf_to_word(pdf_path, output, page_specifications)
+            else:
+                raise ValueError(f"Unknown operation: {operation}")
+        record['ok'] = result is not None
+        record['output'] = output if record['ok'] else None
+    except Exception as e:
+        record['error'] = str(e)
+    record['messages'] = messages.getvalue().splitlines()
+    if not record['ok'] and record['error'] is None:
+        record['error'] = record['messages'][-1] if record['messages'] else "Operation failed."
+    record['seconds'] = time.perf_counter() - start
+    return record
+
+def _run_tasks(tasks):
+    return [run_operation(*task) for task in tasks]
+
+def _run_chunks(tasks, chunks, max_workers, records):
+    """
+    Run chunks of tasks in one process pool.
+
+    :param tasks: List of run_operation argument tuples.
+    :param chunks: Lists of positions in tasks, each sent to a worker at once.
+    :param max_workers: Number of worker processes.
+    :param records: Dictionary filled with the record of each position that ran.
+    :return: The positions lost because a worker process died.
+    """
+    lost = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_tasks, [tasks[position] for position in chunk]) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            try:
+                records.update(zip(chunk, future.result()))
+            except BrokenProcessPool:
+                lost.extend(chunk)
+            except Exception as e:
+                records.update((position, _failed_record(tasks[position], f"Worker process failed: {e}")) for position in chunk)
+    return lost
+
+def _file_state(path):
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+
+def _failed_record(task, error):
+    pdf_path, operation = task[0], task[1]
+    return {'path': pdf_path, 'operation': operation, 'output': None, 'ok': False, 'error': error,
+            'messages': [], 'seconds': 0.0}
+
+def run_batch(paths, operation, options=None, output_dir=None, max_workers=None, chunksize=1):
+    """
+    Run the same operation over many PDF files in a process pool.
+
+    :param paths: A path, directory or glob pattern, or a list of them.
+    :param operation: One of OPERATIONS.
+    :param options: Dictionary of operation arguments (page_specifications, angle).
+    :param output_dir: Directory for outputs of extract and convert (created if missing).
+    :param max_workers: Number of worker processes (defaults to the CPU count).
+    :param chunksize: Number of files sent to a worker at a time.
+    :return: List of result records, in input order. If a worker process dies (e.g. killed
+        for running out of memory), the files it could not finish get an error record and
+        the records of every other file are still returned.
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation: {operation}")
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    tasks = [(pdf_path, operation, options or {}, output_dir) for pdf_path in expand_paths(paths)]
+    if not tasks:
+        return []
+    records = {}
+    lost = list(range(len(tasks)))
+    in_place = operation in ('delete', 'rotate')
+    states = {position: _file_state(tasks[position][0]) for position in lost} if in_place else {}
+    # A worker that dies (e.g. killed for running out of memory) breaks the pool and fails
+    # every unfinished file with it: the lost files are retried once in a fresh pool, then
+    # one per pool to tell the file that kills its worker from those caught in the breakage.
+    # An in-place edit is only retried while its file is unchanged, so it is never applied twice
+    for attempt in range(3):
+        if attempt:
+            failed = [position for position in lost if in_place and _file_state(tasks[position][0]) != states[position]]
+            for position in failed:
+                records[position] = _failed_record(tasks[position], "The worker process died after the file was modified.")
+            lost = [position for position in lost if position not in failed]
+        step = 1 if attempt == 2 else chunksize
+        chunks = [lost[i:i + step] for i in range(0, len(lost), step)]
+        if attempt == 2:
+            lost = [position for chunk in chunks for position in _run_chunks(tasks, [chunk], 1, records)]
+        else:
+            lost = _run_chunks(tasks, chunks, max_workers, records)
+        if not lost:
+            break
+    for position in lost:
+        records[position] = _failed_record(tasks[position], "The worker process died while running the operation.")
+    return [records[position] for position in range(len(tasks))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a PDF operation over many files in parallel.")
+    parser.add_argument('operation', choices=OPERATIONS)
+    parser.add_argument('paths', nargs='+', help="PDF files, directories or glob patterns.")
+    parser.add_argument('--pages', help='Page specification, e.g. "3", "1-5", "20-" or "1-10,15".')
+    parser.add_argument('--angle', type=int, default=90, help="Rotation angle for rotate.")
+    parser.add_argument('--output-dir', help="Directory for extract/convert outputs.")
+    parser.add_argument('--workers', type=int, help="Number of worker processes.")
+    parser.add_argument('--chunksize', type=int, default=1, help="Files sent to a worker at a time.")
+    args = parser.parse_args(argv)
+    if args.operation in ('extract', 'delete', 'rotate') and args.pages is None:
+        parser.error(f"--pages is required for {args.operation}")
+
+    options = {'page_specifications': args.pages, 'angle': args.angle}
+    records = run_batch(args.paths, args.operation, options, args.output_dir, args.workers, args.chunksize)
+    for record in records:
+        print(json.dumps(record))
+    return 0 if all(record['ok'] for record in records) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
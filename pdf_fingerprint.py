@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+from atomic_output import atomic_output
+from pdf_registry import normalize_path
+
+# Size in bytes of a page fingerprint
+FINGERPRINT_SIZE = 16
+
+_INDEX_VERSION = 1
+
+def _object_digest(value, digests, visiting):
+    """
+    Hash a PDF object together with everything it references.
+
+    :param value: The object (direct or IndirectObject).
+    :param digests: Dictionary caching the digest of indirect objects by object number,
+        so resources shared by many pages are hashed once per document.
+    :param visiting: Object numbers being hashed, to break reference cycles.
+    :return: The digest as bytes.
+    """
+    if isinstance(value, IndirectObject):
+        digest = digests.get(value.idnum)
+        if digest is None:
+            if value.idnum in visiting:
+                return b"cycle"
+            visiting.add(value.idnum)
+            digest = digests[value.idnum] = _object_digest(value.get_object(), digests, visiting)
+            visiting.discard(value.idnum)
+        return digest
+
+    digest = hashlib.blake2b(type(value).__name__.encode(), digest_size=FINGERPRINT_SIZE)
+    if isinstance(value, DictionaryObject):
+        for key in sorted(value):
+            if key not in ("/Length", "/Parent"):
+                digest.update(key.encode())
+                digest.update(_object_digest(dict.__getitem__(value, key), digests, visiting))
+        if isinstance(value, StreamObject):
+            digest.update(value._data)
+    elif isinstance(value, ArrayObject):
+        for item in list.__iter__(value):
+            digest.update(_object_digest(item, digests, visiting))
+    else:
+        digest.update(repr(value).encode())
+    return digest.digest()
+
+def page_fingerprint(page, digests=None):
+    """
+    Compute the content fingerprint of a page.
+
+    The fingerprint covers the page's content streams, its resources (fonts,
+    images, forms, ...) down to their stream data, and its boxes and
+    rotation, so byte-identical pages share a fingerprint wherever they come
+    from. Annotations and links are ignored.
+
+    :param page: A PageObject.
+    :param digests: Digest cache shared by the pages of one document (see page_fingerprints).
+    :return: The fingerprint as FINGERPRINT_SIZE bytes.
+    """
+    digests = {} if digests is None else digests
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    for key in ("/MediaBox", "/CropBox", "/Rotate", "/Contents", "/Resources"):
+        if key in page:
+            digest.update(key.encode())
+            digest.update(_object_digest(dict.__getitem__(page, key), digests, set()))
+    return digest.digest()
+
+def page_fingerprints(reader):
+    """
+    Compute the fingerprint of every page of a document.
+
+    :param reader: A PdfReader.
+    :return: List of fingerprints, in page order.
+    """
+    digests = {}
+    return [page_fingerprint(page, digests) for page in reader.pages]
+
+class FingerprintIndex:
+    """
+    Index of page fingerprints over many PDF files, persisted between runs.
+
+    Each file's fingerprints are stored with its mtime and size and computed
+    again only when the file changes. Fingerprints are kept packed (one bytes
+    object per file), and a dictionary from fingerprint to page locations
+    makes lookups O(1) however many pages are indexed.
+    """
+
+    def __init__(self, index_path=None):
+        """
+        :param index_path: JSON file the index is loaded from (if it exists) and saved to.
+        """
+        self.index_path = index_path
+        self._files = {} # normalized path -> {'path', 'mtime_ns', 'size', 'fingerprints'}
+        self._locations = None # fingerprint -> list of (normalized path, 0-based page), built on demand
+        self._dirty = False
+        if index_path is not None and os.path.exists(index_path):
+            self.load(index_path)
+
+    def __len__(self):
+        return sum(len(entry['fingerprints']) // FINGERPRINT_SIZE for entry in self._files.values())
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._get_locations()
+
+    def get_fingerprints(self, pdf_path, reader=None):
+        """
+        Get the page fingerprints of a file, computing them if the file is new or changed.
+
+        :param pdf_path: Path to the PDF file.
+        :param reader: A PdfReader for the file's current contents, if already open.
+        :return: List of fingerprints, in page order.
+        """
+        key = normalize_path(pdf_path)
+        file_stat = os.stat(key)
+        entry = self._files.get(key)
+        if entry is None or (entry['mtime_ns'], entry['size']) != (file_stat.st_mtime_ns, file_stat.st_size):
+            if reader is None:
+                reader = PdfReader(key)
+            entry = self._files[key] = {
+                'path': os.fspath(pdf_path),
+                'mtime_ns': file_stat.st_mtime_ns,
+                'size': file_stat.st_size,
+                'fingerprints': b"".join(page_fingerprints(reader)),
+            }
+            self._locations = None
+            self._dirty = True
+        packed = entry['fingerprints']
+        return [packed[start:start + FINGERPRINT_SIZE] for start in range(0, len(packed), FINGERPRINT_SIZE)]
+
+    def update(self, paths):
+        """
+        Index many files; unchanged files are not read.
+
+        :param paths: Paths to PDF files.
+        """
+        for pdf_path in paths:
+            self.get_fingerprints(pdf_path)
+
+    def remove(self, pdf_path):
+        """
+        Drop a file from the index.
+
+        :param pdf_path: Path to the PDF file.
+        """
+        if self._files.pop(normalize_path(pdf_path), None) is not None:
+            self._locations = None
+            self._dirty = True
+
+    def lookup(self, fingerprint):
+        """
+        Find the indexed pages with a fingerprint.
+
+        :param fingerprint: A page fingerprint.
+        :return: List of (path, page_number) tuples (1-based page numbers).
+        """
+        return [(self._files[key]['path'], page + 1) for key, page in self._get_locations().get(fingerprint, ())]
+
+    def find_duplicates(self, paths=None):
+        """
+        Group the indexed pages that share a fingerprint.
+
+        :param paths: Restrict the search to these files (all indexed files by default).
+        :return: List of groups of (path, page_number) tuples, each with at least two pages.
+        """
+        keys = None if paths is None else {normalize_path(pdf_path) for pdf_path in paths}
+        groups = []
+        for locations in self._get_locations().values():
+            if keys is not None:
+                locations = [location for location in locations if location[0] in keys]
+            if len(locations) > 1:
+                groups.append([(self._files[key]['path'], page + 1) for key, page in locations])
+        return groups
+
+    def save(self, index_path=None):
+        """
+        Write the index to a JSON file atomically (see atomic_output).
+
+        :param index_path: The file to write (defaults to the index_path the index was created with).
+        """
+        index_path = index_path or self.index_path
+        if index_path is None:
+            raise ValueError("No index path to save the fingerprint index to.")
+        files = {
+            key: {'path': entry['path'], 'mtime_ns': entry['mtime_ns'], 'size': entry['size'],
+                  'fingerprints': entry['fingerprints'].hex()}
+            for key, entry in self._files.items()
+        }
+        with atomic_output(index_path, 'w') as index_file:
+            json.dump({'version': _INDEX_VERSION, 'files': files}, index_file)
+        self._dirty = False
+
+    def save_if_changed(self):
+        """
+        Save the index to its index_path if it has one and files were indexed since the last save.
+        """
+        if self._dirty and self.index_path is not None:
+            self.save()
+
+    def load(self, index_path):
+        """
+        Replace the index with the contents of a JSON file written by save().
+
+        :param index_path: The file to read.
+        """
+        with open(index_path) as index_file:
+            data = json.load(index_file)
+        if data.get('version') != _INDEX_VERSION:
+            raise ValueError(f"Unsupported fingerprint index version: {data.get('version')}")
+        self._files = {
+            key: {'path': entry['path'], 'mtime_ns': entry['mtime_ns'], 'size': entry['size'],
+                  'fingerprints': bytes.fromhex(entry['fingerprints'])}
+            for key, entry in data['files'].items()
+        }
+        self._locations = None
+        self._dirty = False
+
+    def _get_locations(self):
+        if self._locations is None:
+            locations = {}
+            for key, entry in self._files.items():
+                packed = entry['fingerprints']
+                for page, start in enumerate(range(0, len(packed), FINGERPRINT_SIZE)):
+                    locations.setdefault(packed[start:start + FINGERPRINT_SIZE], []).append((key, page))
+            self._locations = locations
+        return self._locations
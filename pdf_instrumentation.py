@@ -0,0 +1,172 @@
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError: # Not available on Windows
+    resource = None
+
+# The operation record being filled on the current thread, if any
+_state = threading.local()
+
+@contextmanager
+def span(name):
+    """
+    Time a phase of the current operation (e.g. "open", "parse", "page-select", "write", "convert").
+
+    Time spent in several spans with the same name is added up. Outside an
+    instrumented operation this does nothing.
+
+    :param name: Name of the phase.
+    """
+    record = getattr(_state, 'record', None)
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record['spans'][name] = record['spans'].get(name, 0.0) + time.perf_counter() - start
+
+def add_count(name, amount):
+    """
+    Add to a counter of the current operation (e.g. "bytes_read", "bytes_written", "pages").
+
+    Outside an instrumented operation this does nothing.
+
+    :param name: Name of the counter.
+    :param amount: Amount to add.
+    """
+    record = getattr(_state, 'record', None)
+    if record is not None and amount:
+        record[name] = record.get(name, 0) + amount
+
+def _max_rss():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+class Instrumentation:
+    """
+    Collects a structured record for every PDFOperations call and hands it to hooks.
+
+    A record is a dictionary with the operation name, its total seconds,
+    whether it succeeded, the seconds spent in each span, and the
+    bytes_read, bytes_written and pages counters. Memory is reported as
+    max_rss, the process-wide peak resident set size in bytes since the
+    process started (it never goes down, so it only describes the call that
+    raised it), and max_rss_growth, how many bytes the call raised that peak.
+    For the call's own peak memory, capture it with capture_next_call(): the
+    record then also holds the call's pstats.Stats ('profile'), its
+    tracemalloc peak of Python allocations in bytes ('peak_memory') and its
+    top allocation sites ('memory_top').
+    """
+
+    def __init__(self, hooks=None):
+        """
+        :param hooks: Callables invoked with every finished operation record.
+        """
+        self.hooks = list(hooks or [])
+        self.last_record = None
+        self._capture = None
+
+    def __getstate__(self):
+        # Sent to worker processes with the hooks only; records may hold unpicklable profiles
+        return {'hooks': self.hooks}
+
+    def __setstate__(self, state):
+        self.__init__(state['hooks'])
+
+    def add_hook(self, hook):
+        """
+        Register a callable invoked with every finished operation record,
+        e.g. to forward timings to a metrics system.
+
+        :param hook: A callable taking the record dictionary.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Unregister a hook.
+
+        :param hook: A callable previously added with add_hook.
+        """
+        self.hooks.remove(hook)
+
+    def capture_next_call(self, cprofile=True, trace_memory=True):
+        """
+        Profile the next instrumented operation with cProfile and/or tracemalloc.
+
+        :param cprofile: Capture a cProfile profile of the call.
+        :param trace_memory: Trace the call's Python allocations with tracemalloc.
+        """
+        self._capture = (cprofile, trace_memory)
+
+    @contextmanager
+    def operation(self, name):
+        """
+        Record one operation; spans and counters within it are attributed to it.
+
+        :param name: Name of the operation.
+        :return: The record being filled.
+        """
+        record = {'operation': name, 'spans': {}, 'bytes_read': 0, 'bytes_written': 0, 'pages': 0}
+        capture, self._capture = self._capture, None
+        profiler = cProfile.Profile() if capture and capture[0] else None
+        trace_memory = bool(capture and capture[1]) and not tracemalloc.is_tracing()
+
+        max_rss_before = _max_rss()
+        parent, _state.record = getattr(_state, 'record', None), record
+        if trace_memory:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                record['profile'] = pstats.Stats(profiler)
+            if trace_memory:
+                record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                record['memory_top'] = tracemalloc.take_snapshot().statistics('lineno')[:10]
+                tracemalloc.stop()
+            record['max_rss'] = _max_rss()
+            record['max_rss_growth'] = None if max_rss_before is None else record['max_rss'] - max_rss_before
+            _state.record = parent
+            self.last_record = record
+            for hook in self.hooks:
+                try:
+                    hook(record)
+                except Exception as e:
+                    print(f"An error occurred in an instrumentation hook: {e}")
+
+def instrumented(name):
+    """
+    Decorate a PDFOperations method so every call is recorded by self.instrumentation.
+
+    The record's 'ok' flag is set when the method returns something other than None.
+
+    :param name: Name of the operation in the records.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.operation(name) as record:
+                result = method(self, *args, **kwargs)
+                record['ok'] = result is not None
+                return result
+        return wrapper
+    return decorator
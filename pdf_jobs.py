@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+
+from docx import Document
+from pdf2docx import Converter
+from pypdf import PdfReader, PdfWriter
+
+from atomic_output import atomic_output
+from page_selection import compile_page_specifications
+from pdf_procedures import PDFOperations, _atomic_write, _is_path
+from pdf_registry import normalize_path
+from pdf_stream_writer import StreamingPdfWriter, open_mmap_reader
+
+STATE_FILE = "job.json"
+
+def _write_json_atomic(data, path):
+    # A crash never leaves a partial state or checkpoint file
+    with atomic_output(path, 'w') as output_file:
+        json.dump(data, output_file)
+
+def _file_identity(path):
+    file_stat = os.stat(path)
+    return [normalize_path(path), file_stat.st_mtime_ns, file_stat.st_size]
+
+class _JobState:
+    """
+    Checkpoint state of a chunked job, kept in <work_dir>/job.json.
+
+    A job resumes from the saved state only if it was started for the same
+    inputs (path, mtime and size), output and options; otherwise, or if the
+    saved job had completed, the work directory's checkpoints are discarded
+    and the job starts over.
+    """
+
+    def __init__(self, work_dir, kind, identity):
+        """
+        :param work_dir: Directory holding the state and the chunk checkpoints (created if missing).
+        :param kind: "convert" or "merge".
+        :param identity: JSON-serializable description of the inputs, output and options.
+        """
+        os.makedirs(work_dir, exist_ok=True)
+        self.work_dir = work_dir
+        self.path = os.path.join(work_dir, STATE_FILE)
+        self.state = None
+        if os.path.exists(self.path):
+            with open(self.path) as state_file:
+                state = json.load(state_file)
+            if state.get('kind') == kind and state.get('identity') == identity and state.get('status') == 'running':
+                self.state = state
+        self.resumed = self.state is not None and bool(self.state['chunks'])
+        if self.state is None:
+            self._discard_checkpoints()
+            self.state = {'kind': kind, 'identity': identity, 'status': 'running', 'chunks': {}}
+            self.save()
+
+    def chunk_path(self, number, extension):
+        return os.path.join(self.work_dir, f"chunk_{number:05d}{extension}")
+
+    def is_done(self, number):
+        return str(number) in self.state['chunks']
+
+    def complete_chunk(self, number, failures):
+        """
+        Record a chunk whose checkpoint has been written.
+
+        :param number: 0-based chunk number.
+        :param failures: List of failures isolated in the chunk.
+        """
+        self.state['chunks'][str(number)] = {'failures': failures}
+        self.save()
+
+    def failures(self):
+        return [failure for _, chunk in sorted(self.state['chunks'].items(), key=lambda item: int(item[0]))
+                for failure in chunk['failures']]
+
+    def finish(self, failures):
+        """
+        Mark the job complete and remove its chunk checkpoints; the state file is kept as a report.
+
+        :param failures: Every failure of the job.
+        """
+        self._discard_checkpoints(keep_state=True)
+        self.state.update(status='complete', failures=failures)
+        self.save()
+
+    def save(self):
+        _write_json_atomic(self.state, self.path)
+
+    def _discard_checkpoints(self, keep_state=False):
+        for name in os.listdir(self.work_dir):
+            if name.startswith("chunk_") or (name == STATE_FILE and not keep_state):
+                os.remove(os.path.join(self.work_dir, name))
+
+def _parse_pages(pdf_path, page_indexes):
+    """
+    Parse the layout of pages, raising on the first page that fails.
+
+    :param pdf_path: Path to the PDF file.
+    :param page_indexes: 0-based indexes of the pages to parse.
+    :return: The parsed pages in pdf2docx's stored format.
+    """
+    cv = Converter(os.fspath(pdf_path))
+    try:
+        settings = dict(cv.default_settings, ignore_page_error=False)
+        return cv.parse(pages=page_indexes, **settings).store()
+    finally:
+        cv.close()
+
+def _parse_chunk(pdf_path, page_indexes):
+    """
+    Parse a chunk of pages, isolating the pages that fail.
+
+    The chunk is parsed in one go; if that fails, its pages are parsed one
+    at a time so a single malformed page does not lose the others.
+
+    :param pdf_path: Path to the PDF file.
+    :param page_indexes: 0-based indexes of the pages to parse.
+    :return: A tuple (parsed chunk in pdf2docx's stored format, or None if every page
+        failed, and the list of failures).
+    """
+    try:
+        return _parse_pages(pdf_path, page_indexes), []
+    except Exception as e:
+        if len(page_indexes) == 1:
+            return None, [{'page': page_indexes[0] + 1, 'stage': 'parse', 'error': str(e)}]
+    parsed, failures = None, []
+    for page in page_indexes:
+        try:
+            parsed_page = _parse_pages(pdf_path, [page])
+        except Exception as e:
+            failures.append({'page': page + 1, 'stage': 'parse', 'error': str(e)})
+            continue
+        if parsed is None:
+            parsed = parsed_page
+        else:
+            parsed['pages'].extend(parsed_page['pages'])
+    return parsed, failures
+
+def run_convert_job(pdf_operations, pdf_path, docx_path, work_dir, page_specifications=None, chunk_size=50):
+    """
+    Convert a PDF file to a Word document as a resumable job.
+
+    Pages are parsed in chunks; each parsed chunk is checkpointed to the work
+    directory, so a run that is interrupted (killed, out of memory, ...) and
+    started again with the same arguments resumes after the last completed
+    chunk. Pages that fail to parse or to render are skipped and reported
+    instead of aborting the conversion. The Word document is written to a
+    temporary file and atomically renamed to docx_path.
+
+    :param pdf_operations: The PDFOperations instance the file is selected on.
+    :param pdf_path: Path to the PDF file to convert.
+    :param docx_path: Path to save the converted Word document.
+    :param work_dir: Directory for the job state and checkpoints.
+    :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+    :param chunk_size: Number of pages parsed and checkpointed at a time.
+    :return: A result record with output, ok, resumed, chunks, failures and error.
+    """
+    record = {'output': None, 'ok': False, 'resumed': False, 'chunks': 0, 'failures': [], 'error': None}
+    if not _is_path(pdf_path):
+        record['error'] = "Resumable jobs need a PDF file on disk to checkpoint against."
+        print(record['error'])
+        return record
+    if not pdf_operations._is_selected(pdf_path):
+        record['error'] = f"PDF file {pdf_path} is not selected."
+        print(record['error'])
+        return record
+
+    with pdf_operations.instrumentation.operation('convert_job') as operation:
+        try:
+            cv = Converter(os.fspath(pdf_path))
+            total_pages = len(cv.fitz_doc)
+            cv.close()
+            if page_specifications is None:
+                pages_to_convert = list(range(total_pages))
+            else:
+                pages_to_convert = list(compile_page_specifications(page_specifications).resolve(total_pages, os.fspath(pdf_path)))
+            chunks = [pages_to_convert[i:i + chunk_size] for i in range(0, len(pages_to_convert), chunk_size)]
+
+            identity = {'inputs': [_file_identity(pdf_path)], 'output': normalize_path(docx_path),
+                        'pages': pages_to_convert, 'chunk_size': chunk_size}
+            job = _JobState(work_dir, 'convert', identity)
+            record.update(resumed=job.resumed, chunks=len(chunks))
+
+            for number, chunk in enumerate(chunks):
+                if job.is_done(number):
+                    continue
+                parsed, failures = _parse_chunk(pdf_path, chunk)
+                if parsed is not None:
+                    _write_json_atomic(parsed, job.chunk_path(number, ".json"))
+                job.complete_chunk(number, failures)
+                print(f"Converted chunk {number + 1}/{len(chunks)} of {pdf_path} ({len(failures)} failed pages).")
+
+            # Restore every checkpoint into one converter and render the pages one at a time
+            cv = Converter(os.fspath(pdf_path))
+            failures = job.failures()
+            try:
+                for number in range(len(chunks)):
+                    if os.path.exists(job.chunk_path(number, ".json")):
+                        with open(job.chunk_path(number, ".json")) as chunk_file:
+                            cv.restore(json.load(chunk_file))
+                document = Document()
+                rendered = 0
+                for page in cv.pages:
+                    if not page.finalized:
+                        continue
+                    try:
+                        page.make_docx(document)
+                        rendered += 1
+                    except Exception as e:
+                        failures.append({'page': page.id + 1, 'stage': 'render', 'error': str(e)})
+            finally:
+                cv.close()
+            if not rendered:
+                raise ValueError("No page could be converted.")
+
+            with atomic_output(docx_path) as output_file:
+                document.save(output_file)
+            job.finish(failures)
+
+            record.update(output=docx_path, ok=True, failures=failures)
+            operation['pages'] = rendered
+            print(f"Converted {rendered} pages of {pdf_path} to {docx_path} ({len(failures)} failed pages).")
+        except Exception as e:
+            record['error'] = str(e)
+            print(f"An error occurred while converting PDF to Word: {e}")
+        operation['ok'] = record['ok']
+    return record
+
+def _merge_chunk(paths):
+    """
+    Merge a chunk of input files, isolating the files and pages that fail.
+
+    :param paths: Paths to the PDF files of the chunk.
+    :return: A tuple (PdfWriter, list of failures).
+    """
+    writer = PdfWriter()
+    failures = []
+    for pdf_path in paths:
+        try:
+            reader = PdfReader(pdf_path)
+            total_pages = len(reader.pages)
+        except Exception as e:
+            failures.append({'path': os.fspath(pdf_path), 'page': None, 'error': str(e)})
+            continue
+        for page in range(total_pages):
+            try:
+                writer.add_page(reader.pages[page])
+            except Exception as e:
+                failures.append({'path': os.fspath(pdf_path), 'page': page + 1, 'error': str(e)})
+    return writer, failures
+
+def run_merge_job(pdf_operations, output_filename, work_dir, chunk_size=50):
+    """
+    Merge the selected PDF files as a resumable job.
+
+    The inputs are merged in chunks of files; each merged chunk is
+    checkpointed to the work directory as a PDF, so a run that is interrupted
+    and started again with the same selection resumes after the last
+    completed chunk. Files and pages that cannot be read are skipped and
+    reported instead of aborting the merge. The checkpoints are then
+    concatenated page by page with bounded memory into a temporary file that
+    is atomically renamed to output_filename.
+
+    :param pdf_operations: The PDFOperations instance whose selected files are merged.
+    :param output_filename: The filename of the merged PDF.
+    :param work_dir: Directory for the job state and checkpoints.
+    :param chunk_size: Number of input files merged and checkpointed at a time.
+    :return: A result record with output, ok, resumed, chunks, failures, bytes_written and error.
+    """
+    record = {'output': None, 'ok': False, 'resumed': False, 'chunks': 0, 'failures': [], 'bytes_written': 0, 'error': None}
+    # In-memory PDFs cannot be checkpointed against and are left out
+    paths = [pdf_path for pdf_path in pdf_operations.registry if _is_path(pdf_path)]
+    if not paths:
+        record['error'] = "No PDF files selected for merging."
+        print(record['error'])
+        return record
+
+    with pdf_operations.instrumentation.operation('merge_job') as operation:
+        try:
+            chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+            identity = {'inputs': [_file_identity(pdf_path) for pdf_path in paths],
+                        'output': normalize_path(output_filename), 'chunk_size': chunk_size}
+            job = _JobState(work_dir, 'merge', identity)
+            record.update(resumed=job.resumed, chunks=len(chunks))
+
+            for number, chunk in enumerate(chunks):
+                if job.is_done(number):
+                    continue
+                writer, failures = _merge_chunk(chunk)
+                if len(writer.pages):
+                    _atomic_write(writer, job.chunk_path(number, ".pdf"))
+                del writer
+                job.complete_chunk(number, failures)
+                print(f"Merged chunk {number + 1}/{len(chunks)} ({len(failures)} failures).")
+
+            total_pages = 0
+            with atomic_output(output_filename) as output_file:
+                streaming_writer = StreamingPdfWriter(output_file)
+                for number in range(len(chunks)):
+                    if not os.path.exists(job.chunk_path(number, ".pdf")):
+                        continue
+                    reader, mapping = open_mmap_reader(job.chunk_path(number, ".pdf"))
+                    try:
+                        for page in range(len(reader.pages)):
+                            streaming_writer.add_page(reader, page)
+                        total_pages += len(reader.pages)
+                    finally:
+                        del reader
+                        mapping.close()
+                bytes_written = streaming_writer.close()
+                if not total_pages:
+                    raise ValueError("No page could be merged.")
+                pdf_operations.reader_cache.invalidate(output_filename)
+            failures = job.failures()
+            job.finish(failures)
+
+            record.update(output=output_filename, ok=True, failures=failures, bytes_written=bytes_written)
+            operation.update(pages=total_pages, bytes_written=bytes_written)
+            print(f"Merged {len(paths)} PDF files into {output_filename} ({bytes_written} bytes, {len(failures)} failures).")
+        except Exception as e:
+            record['error'] = str(e)
+            print(f"An error occurred while merging PDF files: {e}")
+        operation['ok'] = record['ok']
+    return record
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a resumable, checkpointed PDF job.")
+    subparsers = parser.add_subparsers(dest='job', required=True)
+    convert_parser = subparsers.add_parser('convert', help="Convert a PDF file to a Word document.")
+    convert_parser.add_argument('pdf_path')
+    convert_parser.add_argument('docx_path')
+    convert_parser.add_argument('--pages', help='Page specification, e.g. "3", "1-5", "20-" or "1-10,15".')
+    merge_parser = subparsers.add_parser('merge', help="Merge PDF files.")
+    merge_parser.add_argument('output_filename')
+    merge_parser.add_argument('paths', nargs='+', help="PDF files, directories or glob patterns, in merge order.")
+    for subparser in (convert_parser, merge_parser):
+        subparser.add_argument('--work-dir', required=True, help="Directory for the job state and checkpoints.")
+        subparser.add_argument('--chunk-size', type=int, default=50, help="Pages (convert) or files (merge) per checkpoint.")
+    args = parser.parse_args(argv)
+
+    pdf_operations = PDFOperations(cache_max_entries=0)
+    if args.job == 'convert':
+        pdf_operations.select_pdf_files(args.pdf_path)
+        record = run_convert_job(pdf_operations, args.pdf_path, args.docx_path, args.work_dir, args.pages, args.chunk_size)
+    else:
+        pdf_operations.select_pdf_files(args.paths)
+        record = run_merge_job(pdf_operations, args.output_filename, args.work_dir, args.chunk_size)
+    print(json.dumps(record))
+    return 0 if record['ok'] else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,187 @@
+import hashlib
+
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NullObject,
+    StreamObject,
+)
+
+# Objects that must keep their identity even when another object has the same content
+_UNIQUE_TYPES = ("/Page", "/Pages", "/Catalog")
+
+class _CountingSink:
+    """
+    Writable stream that only counts the bytes written to it.
+    """
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.size
+
+def _object_size(obj):
+    if obj is None or isinstance(obj, NullObject):
+        return 0
+    sink = _CountingSink()
+    obj.write_to_stream(sink)
+    return sink.size
+
+def _is_free(obj):
+    return obj is None or isinstance(obj, NullObject)
+
+def _replace_references(value, replacements):
+    """
+    Point the references held in value to the objects they were merged into.
+
+    :param value: A DictionaryObject or ArrayObject, updated in place.
+    :param replacements: Dictionary mapping merged object numbers to the IndirectObject kept.
+    """
+    items = value.items() if isinstance(value, DictionaryObject) else enumerate(value)
+    for key, item in list(items):
+        if isinstance(item, IndirectObject):
+            if item.idnum in replacements:
+                value[key] = replacements[item.idnum]
+        elif isinstance(item, (DictionaryObject, ArrayObject)):
+            _replace_references(item, replacements)
+
+def _merge_identical(writer, data_digests):
+    """
+    Merge the writer's objects that have the same content into one.
+
+    :param writer: The PdfWriter to deduplicate.
+    :param data_digests: Dictionary caching the digest of each stream's data by id(), reused across passes.
+    :return: The number of objects merged away.
+    """
+    objects = writer._objects
+    kept = {} # content digest -> object number kept
+    replacements = {}
+    for index, obj in enumerate(objects):
+        if _is_free(obj) or not isinstance(obj, (DictionaryObject, ArrayObject)):
+            continue
+        if isinstance(obj, DictionaryObject) and obj.get("/Type") in _UNIQUE_TYPES:
+            continue
+        digest = hashlib.sha256(type(obj).__name__.encode())
+        if isinstance(obj, StreamObject):
+            digest.update(repr(sorted((key, value) for key, value in obj.items() if key != "/Length")).encode())
+            data_digest = data_digests.get(id(obj))
+            if data_digest is None:
+                data_digest = data_digests[id(obj)] = hashlib.sha256(obj._data).digest()
+            digest.update(data_digest)
+        elif isinstance(obj, DictionaryObject):
+            digest.update(repr(sorted(obj.items())).encode())
+        else:
+            digest.update(repr(obj).encode())
+        digest = digest.digest()
+
+        if digest in kept:
+            replacements[index + 1] = IndirectObject(kept[digest], 0, writer)
+            objects[index] = None
+        else:
+            kept[digest] = index + 1
+
+    if replacements:
+        for obj in objects:
+            if isinstance(obj, (DictionaryObject, ArrayObject)):
+                _replace_references(obj, replacements)
+    return len(replacements)
+
+def _remove_unreachable(writer):
+    """
+    Free the writer's objects that cannot be reached from the trailer.
+
+    :param writer: The PdfWriter to clean up.
+    :return: The number of objects removed.
+    """
+    objects = writer._objects
+    roots = [writer.root_object, writer._info, getattr(writer, '_encrypt_entry', None)]
+    reachable = set()
+    pending = [obj.indirect_reference.idnum for obj in roots
+               if obj is not None and getattr(obj, 'indirect_reference', None) is not None]
+    while pending:
+        idnum = pending.pop()
+        if idnum in reachable or not 0 < idnum <= len(objects):
+            continue
+        reachable.add(idnum)
+        values = [objects[idnum - 1]]
+        while values:
+            value = values.pop()
+            if isinstance(value, IndirectObject):
+                if value.idnum not in reachable:
+                    pending.append(value.idnum)
+            elif isinstance(value, DictionaryObject):
+                values.extend(value.values())
+            elif isinstance(value, ArrayObject):
+                values.extend(value)
+
+    removed = 0
+    for index, obj in enumerate(objects):
+        if not _is_free(obj) and index + 1 not in reachable:
+            objects[index] = None
+            removed += 1
+    return removed
+
+def _compress_streams(writer, level):
+    """
+    Flate-compress the writer's streams that are stored without a filter.
+
+    :param writer: The PdfWriter whose streams are compressed.
+    :param level: zlib compression level (0-9, or -1 for zlib's default).
+    :return: The number of streams compressed.
+    """
+    objects = writer._objects
+    compressed = 0
+    for index, obj in enumerate(objects):
+        if isinstance(obj, StreamObject) and "/Filter" not in obj:
+            encoded = obj.flate_encode(level)
+            # Keep the stream as it is when compression would not make it smaller
+            if len(encoded._data) < len(obj._data):
+                objects[index] = encoded
+                compressed += 1
+    return compressed
+
+def optimize_writer(writer, compress_level=None):
+    """
+    Shrink a PdfWriter's output before it is written.
+
+    Streams with identical data and dictionaries with identical content
+    (fonts, font descriptors, images, shared logos, ...) are merged into a
+    single object by content hash. Merging repeats until nothing changes, so
+    a font is merged once the streams it references have been. Objects no
+    longer reachable from the document catalog are then removed and,
+    optionally, uncompressed streams are Flate-compressed.
+
+    :param writer: The PdfWriter to optimize, modified in place.
+    :param compress_level: zlib level to compress unfiltered streams with (None leaves streams as they are).
+    :return: A dictionary with objects_merged, objects_removed, streams_compressed
+        and bytes_saved (the serialized size of the objects dropped or replaced).
+    """
+    objects = writer._objects
+    before = list(objects)
+
+    data_digests = {}
+    objects_merged = 0
+    while True:
+        merged = _merge_identical(writer, data_digests)
+        if not merged:
+            break
+        objects_merged += merged
+    objects_removed = _remove_unreachable(writer)
+    streams_compressed = 0 if compress_level is None else _compress_streams(writer, compress_level)
+
+    bytes_saved = 0
+    for index, obj in enumerate(before):
+        if objects[index] is not obj:
+            bytes_saved += _object_size(obj) - _object_size(objects[index])
+    return {
+        'objects_merged': objects_merged,
+        'objects_removed': objects_removed,
+        'streams_compressed': streams_compressed,
+        'bytes_saved': bytes_saved,
+    }
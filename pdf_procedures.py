@@ -1,25 +1,458 @@
+import contextlib
+import io
 import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pdf2docx import Converter
 from pypdf import PdfReader, PdfWriter
+from atomic_output import atomic_output
+from page_selection import compile_page_specifications
+from pdf_fingerprint import FingerprintIndex, page_fingerprints
+from pdf_instrumentation import Instrumentation, add_count, instrumented, span
+from pdf_optimize import optimize_writer
+from pdf_registry import FileRegistry
+from pdf_stream_writer import IncrementalPdfWriter, StreamingPdfWriter, open_mmap_reader
+
+class ReaderCache:
+    """
+    LRU cache of parsed PdfReader objects.
+
+    Entries are keyed on the normalized path together with the file's mtime and
+    size, so a file modified behind our back is never served stale. The cache
+    holds the raw file bytes of every entry, which is what max_bytes bounds.
+    """
+
+    def __init__(self, max_entries=16, max_bytes=256 * 1024 * 1024):
+        """
+        :param max_entries: Maximum number of readers kept in the cache (0 disables caching).
+        :param max_bytes: Maximum total size in bytes of the cached files.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict() # normalized path -> (key, reader, size)
+
+    def get_reader(self, pdf_path, store=True):
+        """
+        Return a parsed reader for pdf_path, parsing the file on a cache miss.
+
+        :param pdf_path: Path to the PDF file.
+        :param store: Whether a reader parsed on a miss is kept in the cache.
+        :return: A PdfReader for the current contents of the file.
+        """
+        path = os.path.normcase(os.path.abspath(pdf_path))
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            self._entries.move_to_end(path)
+            return entry[1]
+
+        self.misses += 1
+        self.invalidate(path)
+        with span('open'):
+            with open(path, 'rb') as file:
+                data = file.read()
+        add_count('bytes_read', len(data))
+        with span('parse'):
+            reader = PdfReader(io.BytesIO(data))
+
+        if store and 0 < self.max_entries and len(data) <= self.max_bytes:
+            self._entries[path] = (key, reader, len(data))
+            self.current_bytes += len(data)
+            self._evict()
+        return reader
+
+    def invalidate(self, pdf_path):
+        """
+        Drop the cached reader for pdf_path, if any.
+
+        :param pdf_path: Path to the PDF file.
+        """
+        path = os.path.normcase(os.path.abspath(pdf_path))
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def clear(self):
+        """
+        Drop every cached reader. Hit/miss counters are kept.
+        """
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """
+        Get the cache counters.
+
+        :return: A dictionary with hits, misses, entries and bytes.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+        }
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+def _same_file(output, source):
+    # Whether a path output names the same file as a path source (under any spelling or link)
+    if not (_is_path(output) and _is_path(source)):
+        return False
+    try:
+        return os.path.samefile(output, source)
+    except OSError:
+        return False
+
+def _is_buffer(source):
+    return isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'read')
+
+def _source_name(source):
+    """
+    Describe a PDF source in messages.
+
+    :param source: A path, bytes-like object or binary stream.
+    :return: The path, or a placeholder for in-memory sources.
+    """
+    return os.fspath(source) if _is_path(source) else "<in-memory PDF>"
+
+class _BufferReader(io.RawIOBase):
+    """
+    Read-only, seekable binary stream over a bytes-like object.
+
+    Unlike io.BytesIO, it never copies the whole buffer; only the chunks that
+    are read are materialized.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._position + size, len(self._view))
+        data = bytes(self._view[self._position:end])
+        self._position = max(self._position, end)
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def _open_buffer(source):
+    """
+    Open a PdfReader over an in-memory PDF without copying it.
+
+    :param source: bytes, bytearray, memoryview or a readable binary stream.
+    :return: A PdfReader.
+    """
+    if isinstance(source, bytes):
+        return PdfReader(io.BytesIO(source)) # BytesIO shares an immutable bytes object
+    if isinstance(source, (bytearray, memoryview)):
+        return PdfReader(_BufferReader(source))
+    return PdfReader(source)
+
+def _buffer_bytes(source):
+    """
+    Get the contents of an in-memory PDF as bytes (for libraries that need bytes).
+
+    :param source: bytes, bytearray, memoryview or a readable binary stream.
+    :return: The PDF data.
+    """
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+def _atomic_write(writer, output_filename):
+    """
+    Write a PdfWriter to output_filename through a temporary file and a rename.
+
+    :param writer: The PdfWriter to serialize.
+    :param output_filename: The final filename.
+    :return: The number of bytes written.
+    """
+    with span('write'), atomic_output(output_filename) as output_file:
+        writer.write(output_file)
+        bytes_written = output_file.tell()
+    add_count('bytes_written', bytes_written)
+    add_count('pages', len(writer.pages))
+    return bytes_written
+
+def _write_pdf(writer, output):
+    """
+    Write a PdfWriter to a filename or a writable binary stream.
+
+    :param writer: The PdfWriter to serialize.
+    :param output: The output filename or stream.
+    :return: The number of bytes written.
+    """
+    with span('write'):
+        if _is_path(output):
+            with open(output, 'wb') as output_file:
+                writer.write(output_file)
+                bytes_written = output_file.tell()
+        else:
+            start = output.tell()
+            writer.write(output)
+            bytes_written = output.tell() - start
+    add_count('bytes_written', bytes_written)
+    add_count('pages', len(writer.pages))
+    return bytes_written
+
+def _pdf_bytes(writer):
+    """
+    Serialize a PdfWriter to bytes.
+
+    :param writer: The PdfWriter to serialize.
+    :return: The PDF data.
+    """
+    output = io.BytesIO()
+    with span('write'):
+        writer.write(output)
+    add_count('bytes_written', output.tell())
+    add_count('pages', len(writer.pages))
+    return output.getvalue()
+
+class EditPlan:
+    """
+    A queue of deferred edits against one PDF document.
+
+    Edits are composed into a single final page ordering as they are queued;
+    nothing is read or written until commit(). Page numbers given to each
+    edit refer to the document as left by the previously queued edits, just
+    like calling the corresponding PDFOperations methods one after another.
+    """
+
+    def __init__(self, pdf_operations, pdf_path):
+        """
+        :param pdf_operations: The PDFOperations instance whose reader cache is used.
+        :param pdf_path: Path to the PDF file being edited, or an in-memory PDF.
+        """
+        self.pdf_operations = pdf_operations
+        self.pdf_path = pdf_path
+        self.instrumentation = pdf_operations.instrumentation
+        total_pages = len(pdf_operations._get_reader(pdf_path).pages)
+        # Each entry is [source path, 0-based source page index, clockwise rotation]
+        self.pages = [[pdf_path, page, 0] for page in range(total_pages)]
+        self.extractions = []
+
+    def delete(self, page_specifications):
+        """
+        Queue the deletion of pages.
+
+        :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+        :return: The plan, so edits can be chained.
+        """
+        pages_to_delete = set(compile_page_specifications(page_specifications).resolve(len(self.pages), _source_name(self.pdf_path)))
+        self.pages = [entry for page, entry in enumerate(self.pages) if page not in pages_to_delete]
+        return self
+
+    def rotate(self, page_specifications, angle):
+        """
+        Queue the rotation of pages.
+
+        :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+        :param angle: The angle to rotate the pages (90, 180, or 270 degrees).
+        :return: The plan, so edits can be chained.
+        """
+        if angle not in [90, 180, 270]:
+            raise ValueError("Invalid angle. Please use 90, 180, or 270 degrees.")
+        for page in compile_page_specifications(page_specifications).resolve(len(self.pages), _source_name(self.pdf_path)):
+            self.pages[page][2] = (self.pages[page][2] + angle) % 360
+        return self
+
+    def insert(self, source_pdf_path, page_number, insert_position):
+        """
+        Queue the insertion of a page from another PDF.
+
+        :param source_pdf_path: Path to the source PDF file from which the page will be taken.
+        :param page_number: The page number (1-based) from the source PDF to insert.
+        :param insert_position: The position (1-based) where the page will be inserted.
+        :return: The plan, so edits can be chained.
+        :raises ValueError: If the source PDF file is not selected, or the page number or position is invalid.
+        """
+        if not self.pdf_operations._is_selected(source_pdf_path):
+            raise ValueError(f"Source PDF file {source_pdf_path} is not selected.")
+        total_source_pages = len(self.pdf_operations._get_reader(source_pdf_path).pages)
+        if not (1 <= page_number <= total_source_pages and 1 <= insert_position <= len(self.pages) + 1):
+            raise ValueError("Invalid page number or insert position.")
+        self.pages.insert(insert_position - 1, [source_pdf_path, page_number - 1, 0])
+        return self
+
+    def extract(self, page_specifications, output_filename):
+        """
+        Queue the extraction of pages, as they stand at this point of the plan, to another file.
+
+        :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+        :param output_filename: Filename or writable binary stream to save the extracted pages.
+        :return: The plan, so edits can be chained.
+        """
+        pages = compile_page_specifications(page_specifications).resolve(len(self.pages), _source_name(self.pdf_path))
+        self.extractions.append((output_filename, [list(self.pages[page]) for page in pages]))
+        return self
+
+    @instrumented('edit_plan')
+    def commit(self):
+        """
+        Apply the plan: read every involved document once and atomically
+        replace the edited file (and write any queued extractions).
+
+        :return: The number of bytes written to the edited file, or the
+            edited document as bytes when the plan edits an in-memory PDF.
+        """
+        cache = self.pdf_operations.reader_cache
+        readers = {} # id(source) -> reader, since in-memory sources may not be hashable
+        for entries in [self.pages] + [entries for _, entries in self.extractions]:
+            for source_path, _, _ in entries:
+                if id(source_path) not in readers:
+                    readers[id(source_path)] = self.pdf_operations._get_reader(source_path)
+
+        for output_filename, entries in self.extractions:
+            extracted_writer = self._build_writer(entries, readers)
+            self.pdf_operations._optimize(extracted_writer, output_filename)
+            if _is_path(output_filename):
+                cache.invalidate(output_filename)
+                _atomic_write(extracted_writer, output_filename)
+                print(f"Extracted pages saved to {output_filename}")
+            else:
+                _write_pdf(extracted_writer, output_filename)
+
+        modified_writer = self._build_writer(self.pages, readers)
+        self.pdf_operations._optimize(modified_writer, self.pdf_path)
+        if not _is_path(self.pdf_path):
+            return _pdf_bytes(modified_writer)
+        cache.invalidate(self.pdf_path)
+        bytes_written = _atomic_write(modified_writer, self.pdf_path)
+        print(f"Original PDF file {self.pdf_path} has been modified.")
+        return bytes_written
+
+    def _build_writer(self, entries, readers):
+        writer = PdfWriter()
+        with span('copy'):
+            for source_path, page, angle in entries:
+                written_page = writer.add_page(readers[id(source_path)].pages[page])
+                if angle:
+                    written_page.rotate(angle)
+        return writer
+
+def _open_converter(pdf_source):
+    """
+    Open a pdf2docx Converter on a path or an in-memory PDF.
+
+    :param pdf_source: Path to the PDF file, or an in-memory PDF.
+    :return: A Converter.
+    """
+    if _is_path(pdf_source):
+        return Converter(os.fspath(pdf_source))
+    cv = Converter(stream=_buffer_bytes(pdf_source))
+    cv.filename_pdf = "" # Converter.store() takes the basename of the source filename
+    return cv
+
+def _parse_page_shard(pdf_source, page_indexes):
+    """
+    Parse the layout of a shard of pages in a worker process.
+
+    :param pdf_source: Path to the PDF file, or its contents as bytes.
+    :param page_indexes: 0-based indexes of the pages to parse.
+    :return: The parsed pages in pdf2docx's stored (picklable) format.
+    """
+    cv = _open_converter(pdf_source)
+    try:
+        return cv.parse(pages=page_indexes, **cv.default_settings).store()
+    finally:
+        cv.close()
 
 class PDFOperations:
-    def __init__(self):
-        self.pdf_paths = []
+    def __init__(self, cache_max_entries=16, cache_max_bytes=256 * 1024 * 1024, instrumentation=None,
+                 optimize=False, compress_level=None, fingerprint_index=None):
+        """
+        :param cache_max_entries: Maximum number of parsed documents kept in the reader cache.
+        :param cache_max_bytes: Maximum total size in bytes of the documents kept in the reader cache.
+        :param instrumentation: Instrumentation receiving a timing record for every operation
+            (a new one without hooks by default).
+        :param optimize: Deduplicate identical objects and drop unused ones in every written PDF
+            (see pdf_optimize.optimize_writer; low-memory extraction is not optimized).
+        :param compress_level: When optimizing, also Flate-compress uncompressed streams at this zlib level.
+        :param fingerprint_index: FingerprintIndex holding the page fingerprints of the selected files
+            (pass one with an index_path to reuse fingerprints across runs; in-memory by default).
+        """
+        self.registry = FileRegistry()
+        self.reader_cache = ReaderCache(cache_max_entries, cache_max_bytes)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self.optimize = optimize
+        self.compress_level = compress_level
+        self.fingerprint_index = fingerprint_index if fingerprint_index is not None else FingerprintIndex()
 
-    def select_pdf_files(self, paths):
+    @property
+    def pdf_paths(self):
+        """
+        The selected PDF files, in selection order, as a read-only tuple.
+
+        Selection is kept in a FileRegistry, so the files cannot be changed by
+        mutating this value (pdf_paths.append(path) raises AttributeError): use
+        select_pdf_files() or assign a new list of paths.
+        """
+        return tuple(self.registry)
+
+    @pdf_paths.setter
+    def pdf_paths(self, paths):
+        self.registry = FileRegistry()
+        self.registry.add_many(paths)
+
+    def select_pdf_files(self, paths, max_workers=8):
         """
         Select PDF files by specifying their paths.
 
-        :param paths: A single path or a list of paths to PDF files.
+        Directories (searched recursively for .pdf files) and glob patterns
+        are expanded, files are stat'ed concurrently, and a file already
+        selected under any spelling of its path is not added again.
+        In-memory PDFs (bytes, bytearray, memoryview or a readable binary
+        stream) are accepted as they are, e.g. to be merged with files.
+
+        :param paths: A single path, directory, glob pattern or in-memory PDF, or a list of them.
+        :param max_workers: Number of threads gathering file stats.
         """
 
-        if isinstance(paths, str):
+        if _is_path(paths) or _is_buffer(paths):
             paths = [paths] # Convert to list if a single path is provided
-        for path in paths:
-            if os.path.isfile(path) and path.lower().endswith('.pdf'):
-                self.pdf_paths.append(path)
-            else:
-                print(f"Invalid PDF file: {path}")
+        for path in self.registry.add_many(paths, max_workers):
+            print(f"Invalid PDF file: {path}")
 
     def get_selected_files(self):
         """
@@ -27,190 +460,486 @@ class PDFOperations:
 
         :return: List of selected PDF file paths.
         """
-        return self.pdf_paths
+        return list(self.registry)
+
+    def get_file_info(self, pdf_path):
+        """
+        Get the cached metadata of a selected PDF file.
+
+        :param pdf_path: Path to the PDF file.
+        :return: A dictionary with path, size, mtime, page_count and encrypted, or None if not selected.
+        """
+        return self.registry.get_info(pdf_path)
+
+    def get_cache_stats(self):
+        """
+        Get the hit/miss counters of the parsed-document cache.
+
+        :return: A dictionary with hits, misses, entries and bytes.
+        """
+        return self.reader_cache.stats()
+
+    def find_duplicate_pages(self):
+        """
+        Find the pages that appear more than once across the selected files.
+
+        Page fingerprints are computed for files not yet in the fingerprint
+        index (or changed since they were indexed) and the index is saved if
+        it has an index_path.
+
+        :return: List of groups of (path, page_number) tuples (1-based page numbers) sharing the same content.
+        """
+        paths = [pdf_path for pdf_path in self.registry if _is_path(pdf_path)]
+        try:
+            for pdf_path in paths:
+                self._page_fingerprints(pdf_path)
+            self.fingerprint_index.save_if_changed()
+        except Exception as e:
+            print(f"An error occurred while indexing pages: {e}")
+            return None
+        duplicates = self.fingerprint_index.find_duplicates(paths)
+        print(f"Found {len(duplicates)} pages duplicated across {len(paths)} PDF files.")
+        return duplicates
+
+    def _page_fingerprints(self, pdf_path, reader=None):
+        with span('fingerprint'):
+            if not _is_path(pdf_path):
+                return page_fingerprints(reader if reader is not None else self._get_reader(pdf_path))
+            if reader is None:
+                # Only read the file if its fingerprints are not indexed yet
+                return self.fingerprint_index.get_fingerprints(pdf_path)
+            return self.fingerprint_index.get_fingerprints(pdf_path, reader)
+
+    def _skip_duplicates(self, pdf_path, reader, pages, seen):
+        """
+        Drop the pages whose content was already seen.
 
-    def extract_pdf_pages(self, pdf_path, page_specifications, output_filename):
+        :param pdf_path: Path to the PDF file, or an in-memory PDF.
+        :param reader: The PdfReader of the document.
+        :param pages: 0-based indexes of the pages, in output order.
+        :param seen: Set of the fingerprints already output, updated in place.
+        :return: The 0-based indexes of the pages to keep.
+        """
+        fingerprints = self._page_fingerprints(pdf_path, reader)
+        unique_pages = []
+        for page in pages:
+            if fingerprints[page] not in seen:
+                seen.add(fingerprints[page])
+                unique_pages.append(page)
+        return unique_pages
+
+    def _is_selected(self, pdf_path):
+        # In-memory PDFs are passed in directly and need no selection
+        return not _is_path(pdf_path) or pdf_path in self.registry
+
+    def _get_reader(self, pdf_path, store=True):
+        if _is_path(pdf_path):
+            reader = self.reader_cache.get_reader(pdf_path, store)
+        else:
+            with span('parse'):
+                reader = _open_buffer(pdf_path)
+        with span('parse'):
+            len(reader.pages) # Load the page tree here so it is not timed as page copying
+        return reader
+
+    def _optimize(self, writer, output):
+        if not self.optimize:
+            return None
+        with span('optimize'):
+            report = optimize_writer(writer, self.compress_level)
+        add_count('bytes_saved', report['bytes_saved'])
+        print(f"Optimized {_source_name(output)}: saved {report['bytes_saved']} bytes "
+              f"({report['objects_merged']} duplicate and {report['objects_removed']} unused objects removed, "
+              f"{report['streams_compressed']} streams compressed).")
+        return report
+
+    def _write_output(self, writer, output, replace=False):
+        # A file being replaced is written atomically, so a crash mid-write never truncates it
+        self._optimize(writer, output)
+        if _is_path(output):
+            self.reader_cache.invalidate(output)
+            if replace:
+                return _atomic_write(writer, output)
+        return _write_pdf(writer, output)
+
+    def _write_incremental(self, reader, pdf_path, output, edit, message):
+        """
+        Save an edit as an incremental update appended to the original document.
+
+        :param reader: The PdfReader of the document.
+        :param pdf_path: Path to the PDF file, or an in-memory PDF.
+        :param output: Filename or writable binary stream to write the updated document to
+            instead of appending to pdf_path (an output naming pdf_path itself is appended to).
+        :param edit: Callable applying the edit to an IncrementalPdfWriter.
+        :param message: Message printed once the update is written.
+        :return: The number of bytes appended, or the updated document as bytes for an
+            in-memory PDF without output.
+        """
+        in_memory = output is None and not _is_path(pdf_path)
+        with span('write'):
+            if (output is None and not in_memory) or _same_file(output, pdf_path):
+                # Append to the file itself; a failed update is truncated away
+                self.reader_cache.invalidate(pdf_path)
+                with open(pdf_path, 'r+b') as output_file:
+                    original_size = output_file.seek(0, io.SEEK_END)
+                    try:
+                        incremental_writer = IncrementalPdfWriter(reader, output_file)
+                        edit(incremental_writer)
+                        bytes_written = incremental_writer.close()
+                    except BaseException:
+                        output_file.truncate(original_size)
+                        raise
+            else:
+                # Other outputs get a copy of the original data followed by the update
+                if in_memory:
+                    output_context = contextlib.nullcontext(io.BytesIO())
+                elif _is_path(output):
+                    self.reader_cache.invalidate(output)
+                    output_context = atomic_output(output)
+                else:
+                    output_context = contextlib.nullcontext(output)
+                with output_context as output_file:
+                    if _is_path(pdf_path):
+                        with open(pdf_path, 'rb') as source_file:
+                            shutil.copyfileobj(source_file, output_file)
+                    else:
+                        output_file.write(_buffer_bytes(pdf_path))
+                    incremental_writer = IncrementalPdfWriter(reader, output_file)
+                    edit(incremental_writer)
+                    bytes_written = incremental_writer.close()
+        add_count('bytes_written', bytes_written)
+        add_count('pages', incremental_writer.pages_written)
+        if in_memory:
+            return output_file.getvalue()
+        print(f"{message} (incremental update of {bytes_written} bytes)")
+        return bytes_written
+
+    def _write_modified(self, writer, pdf_path, output, message):
+        # In-place edits overwrite the file, write to output if given, or return bytes for in-memory PDFs
+        if output is None and not _is_path(pdf_path):
+            self._optimize(writer, pdf_path)
+            return _pdf_bytes(writer)
+        self._write_output(writer, output if output is not None else pdf_path,
+                           replace=output is None or _same_file(output, pdf_path))
+        print(message)
+        return writer
+
+    @instrumented('extract')
+    def extract_pdf_pages(self, pdf_path, page_specifications, output_filename, low_memory=False, return_writer=True,
+                          skip_duplicates=False):
         """
             Extract specific pages from a PDF file.
 
-            :param pdf_path: Path to the PDF file.
-            :param page specification: A single page number, a range (e.g., "1-5"), or a list of pages)
-            :param output_filename: Filename to save the extracted pages
-            :return: A PdfWriter object containing the extracted pages.
+            In low-memory mode the input is read through a memory map and each
+            selected page, with only the objects it references, is written to
+            the output as soon as it is copied, so no PdfWriter is built.
+
+            :param pdf_path: Path to the PDF file, or an in-memory PDF (bytes, bytearray, memoryview or binary stream).
+            :param page specification: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (see PageSelection))
+            :param output_filename: Filename or writable binary stream to save the extracted pages (required in low-memory mode)
+            :param low_memory: Stream the extraction with bounded memory instead of building a PdfWriter.
+            :param return_writer: Return the in-memory PdfWriter; if False the writer is released
+                and output_filename is returned instead.
+            :param skip_duplicates: Keep only the first of the selected pages that have the same content
+                (see find_duplicate_pages).
+            :return: A PdfWriter object containing the extracted pages, or output_filename
+                in low-memory mode or when return_writer is False.
         """
-        if pdf_path not in self.pdf_paths:
+        if not self._is_selected(pdf_path):
             print(f"PDF file {pdf_path} is not selected.")
             return None
+        if low_memory:
+            return self._extract_pdf_pages_streaming(pdf_path, page_specifications, output_filename, skip_duplicates)
         extracted_writer = PdfWriter()
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                total_pages = len(reader.pages)
+            reader = self._get_reader(pdf_path)
+            total_pages = len(reader.pages)
 
-                # Process the page specifications
-                pages_to_extract = set() # Use a set to avoid duplicates
+            # Process the page specifications
+            with span('page-select'):
+                pages_to_extract = compile_page_specifications(page_specifications).resolve(total_pages, _source_name(pdf_path))
+            if skip_duplicates:
+                pages_to_extract = self._skip_duplicates(pdf_path, reader, pages_to_extract, set())
+                self.fingerprint_index.save_if_changed()
 
-                if isinstance(page_specifications, int):
-                    # Single page
-                    if 1 <= page_specifications <= total_pages:
-                        pages_to_extract.add(page_specifications - 1)
-                    else:
-                        print(f"Page number {page_specifications} is out of range for {pdf_path}.")
-                elif isinstance(page_specifications, str):
-                    # Range of pages
-                    if '-' in page_specifications:
-                        start, end = map(int, page_specifications.split('-'))
-                        for page in range(start - 1, end): # Convert to 0-indexed
-                            if 0 <= page < total_pages:
-                                pages_to_extract.add(page)
-                            else:
-                                print(f"Page number {page + 1} is out of range for {pdf_path}.")
-                    else:
-                        # Single page as string (1-based)
-                        page_number = int(page_specifications)
-                        if 1 <= page_number <= total_pages:
-                            pages_to_extract.add(page_number - 1)
-
-                elif isinstance(page_specifications, list):
-                    # List of pages
-                    for page_number in page_specifications:
-                        if 1 <= page_number <= total_pages:
-                            pages_to_extract.add(page_number - 1)
-                        else:
-                            print(f"Page number {page_number} is out of range for {pdf_path}.")
-                # Add the valid pages to the writer
-                for page in sorted(pages_to_extract):
+            # Add the selected pages to the writer
+            with span('copy'):
+                for page in pages_to_extract:
                     extracted_writer.add_page(reader.pages[page])
 
             # Save the extracted pages to a new PDF file if an output filename is provided
             if output_filename:
-                with open(output_filename, 'wb') as output_file:
-                    extracted_writer.write(output_file)
-                print(f"Extracted pages saved to {output_filename}")
+                self._write_output(extracted_writer, output_filename)
+                print(f"Extracted pages saved to {_source_name(output_filename)}")
 
-            return extracted_writer
+            return extracted_writer if return_writer else output_filename
         except Exception as e:
             print(f"An error occured while extracting pages: {e}")
             return None
-    
-    def merge_pdf_files(self, output_filename):
+
+    def _extract_pdf_pages_streaming(self, pdf_path, page_specifications, output_filename, skip_duplicates=False):
+        if not output_filename:
+            print("An output filename is required for low-memory extraction.")
+            return None
+        reader, mapping = None, None
+        try:
+            # In-memory inputs are already mapped; files are read through mmap
+            with span('open'):
+                if _is_path(pdf_path):
+                    reader, mapping = open_mmap_reader(pdf_path)
+                else:
+                    reader = _open_buffer(pdf_path)
+            with span('parse'):
+                total_pages = len(reader.pages)
+            with span('page-select'):
+                pages_to_extract = compile_page_specifications(page_specifications).resolve(total_pages, _source_name(pdf_path))
+            if skip_duplicates:
+                pages_to_extract = self._skip_duplicates(pdf_path, reader, pages_to_extract, set())
+                self.fingerprint_index.save_if_changed()
+
+            # Files are written to a temporary file renamed into place: truncating the input
+            # (or any file) while it is memory-mapped would crash the process
+            if _is_path(output_filename):
+                self.reader_cache.invalidate(output_filename)
+                output_context = atomic_output(output_filename)
+            else:
+                output_context = contextlib.nullcontext(output_filename)
+            # Pages are copied and written in the same step
+            with span('write'), output_context as output_file:
+                streaming_writer = StreamingPdfWriter(output_file)
+                for page in pages_to_extract:
+                    streaming_writer.add_page(reader, page)
+                bytes_written = streaming_writer.close()
+            add_count('bytes_written', bytes_written)
+            add_count('pages', len(pages_to_extract))
+            print(f"Extracted pages saved to {_source_name(output_filename)} ({bytes_written} bytes)")
+            return output_filename
+        except Exception as e:
+            print(f"An error occured while extracting pages: {e}")
+            return None
+        finally:
+            reader = None
+            if mapping is not None:
+                mapping.close()
+
+    @instrumented('merge')
+    def merge_pdf_files(self, output_filename, progress_callback=None, skip_duplicates=False):
         """
         Merge multiple PDF files into a single PDF file.
 
+        The inputs are streamed one at a time, so only one reader is open at
+        any moment, and the merged document is serialized once at the end.
 
-        :param output_filename: The filename of the merged PDF 
+        :param output_filename: The filename of the merged PDF, or a writable binary stream
+        :param progress_callback: Optional callable invoked as
+            ``progress_callback(index, total, pdf_path)`` after each input is merged.
+        :param skip_duplicates: Leave out pages whose content already appears earlier in the
+            merged document (see find_duplicate_pages).
+        :return: The number of bytes written to output_filename.
         """
-        if not self.pdf_paths:
+        if not self.registry:
             print("No PDF files selected for merging.")
             return
         
         merged_writer = PdfWriter()
+        total_files = len(self.registry)
+        seen = set() # Fingerprints of the pages merged so far
+        skipped = 0
         try:
-            for pdf_path in self.pdf_paths:
-                with open(pdf_path, 'rb') as file:
-                    reader = PdfReader(file)
-                    for page in reader.pages:
-                        merged_writer.add_page(page)
-
-                with open(output_filename, 'wb') as output_file:
-                    merged_writer.write(output_file)
-                print(f"Merged PDF saved as {output_filename}")
+            for index, pdf_path in enumerate(self.registry, start=1):
+                reader = self._get_reader(pdf_path, store=False)
+                pages = range(len(reader.pages))
+                if skip_duplicates:
+                    unique_pages = self._skip_duplicates(pdf_path, reader, pages, seen)
+                    skipped += len(pages) - len(unique_pages)
+                    pages = unique_pages
+                with span('copy'):
+                    for page in pages:
+                        merged_writer.add_page(reader.pages[page])
+                del reader # Release the reader before opening the next input
+                if progress_callback is not None:
+                    progress_callback(index, total_files, pdf_path)
+            if skip_duplicates:
+                self.fingerprint_index.save_if_changed()
+
+            bytes_written = self._write_output(merged_writer, output_filename)
+            if skip_duplicates:
+                print(f"Merged {total_files} PDF files into {_source_name(output_filename)} ({bytes_written} bytes, "
+                      f"{skipped} duplicate pages skipped).")
+            else:
+                print(f"Merged {total_files} PDF files into {_source_name(output_filename)} ({bytes_written} bytes).")
+            return bytes_written
         except Exception as e:
             print(f"An error occurred while mergin PDF files: {e}")
     
-    def delete_pdf_pages(self, pdf_path, page_specifications):
+    @instrumented('split')
+    def split_pdf(self, pdf_path, ranges=None, every=None, by_bookmarks=False, output_dir=None,
+                  name_template="{stem}_{index:03d}.pdf", max_workers=4):
+        """
+        Split a PDF file into many files in one pass.
+
+        The source is parsed once; pages are copied into one writer per output
+        and the outputs are serialized and written concurrently by a thread pool.
+        Exactly one of ranges, every or by_bookmarks selects how to split.
+
+        :param pdf_path: Path to the PDF file, or an in-memory PDF.
+        :param ranges: A list of page specifications, one per output (e.g., ["1-3", 4, "5-"]).
+        :param every: Split into outputs of this many pages each (every=1 bursts every page).
+        :param by_bookmarks: Start a new output at every top-level bookmark.
+        :param output_dir: Directory for the outputs (defaults to the source's directory; for an
+            in-memory source without output_dir the outputs are returned as bytes).
+        :param name_template: Output filename template; fields are stem, index (1-based), first and last (1-based pages).
+        :param max_workers: Number of threads writing outputs.
+        :return: List of output filenames (or bytes objects), in split order.
+        """
+        if not self._is_selected(pdf_path):
+            print(f"PDF file {pdf_path} is not selected.")
+            return None
+        if sum([ranges is not None, every is not None, bool(by_bookmarks)]) != 1:
+            print("Specify exactly one of ranges, every or by_bookmarks.")
+            return None
+
+        try:
+            reader = self._get_reader(pdf_path)
+            total_pages = len(reader.pages)
+
+            with span('page-select'):
+                if ranges is not None:
+                    groups = [compile_page_specifications(spec).resolve(total_pages, _source_name(pdf_path)) for spec in ranges]
+                elif every is not None:
+                    groups = [range(start, min(start + every, total_pages)) for start in range(0, total_pages, every)]
+                else:
+                    # Outline items without a page destination (URI or remote links) do not start a part
+                    starts = {reader.get_destination_page_number(item) for item in reader.outline if not isinstance(item, list)}
+                    starts = sorted({start for start in starts if start is not None and start >= 0} | {0})
+                    groups = [range(start, end) for start, end in zip(starts, starts[1:] + [total_pages]) if start < end]
+
+            in_memory = output_dir is None and not _is_path(pdf_path)
+            stem = os.path.splitext(os.path.basename(pdf_path))[0] if _is_path(pdf_path) else "document"
+            directory = output_dir if output_dir is not None or in_memory else os.path.dirname(pdf_path)
+            output_filenames = []
+            # Bound the number of built writers waiting to be written
+            in_flight = threading.BoundedSemaphore(max_workers * 2)
+            futures = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for index, pages in enumerate(groups, start=1):
+                    if not pages:
+                        continue
+                    in_flight.acquire()
+                    split_writer = PdfWriter()
+                    with span('copy'):
+                        for page in pages:
+                            split_writer.add_page(reader.pages[page])
+                    if in_memory:
+                        self._optimize(split_writer, pdf_path)
+                        future = executor.submit(_pdf_bytes, split_writer)
+                    else:
+                        output_filename = os.path.join(directory, name_template.format(
+                            stem=stem, index=index, first=pages[0] + 1, last=pages[-1] + 1))
+                        self._optimize(split_writer, output_filename)
+                        self.reader_cache.invalidate(output_filename)
+                        future = executor.submit(_write_pdf, split_writer, output_filename)
+                        output_filenames.append(output_filename)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
+                    add_count('pages', len(pages))
+                # Outputs are written on the pool's threads; time what is left once copying is done
+                with span('write'):
+                    results = [future.result() for future in futures]
+            add_count('bytes_written', sum(len(result) for result in results) if in_memory else sum(results))
+            print(f"Split {_source_name(pdf_path)} into {len(futures)} files.")
+            return results if in_memory else output_filenames
+        except Exception as e:
+            print(f"An error occurred while splitting the PDF file: {e}")
+            return None
+
+    @instrumented('delete')
+    def delete_pdf_pages(self, pdf_path, page_specifications, output=None, incremental=False):
         """
             Delete specific pages from a PDF file and overwrite the original file.
 
-            :param pdf_path: Path to the PDF file.
-            :param page_specifications: A single page number, a range (e.g., "1-5"), or a list of pages (1-based indexing).
+            :param pdf_path: Path to the PDF file, or an in-memory PDF.
+            :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+            :param output: Filename or writable binary stream to write to instead of overwriting pdf_path.
+            :param incremental: Append an incremental update holding only the changed page tree
+                nodes instead of rewriting the document (the deleted pages' data stays in the file).
+            :return: The PdfWriter with the remaining pages, or the modified document as bytes
+                for an in-memory PDF without output. In incremental mode, the number of bytes
+                appended instead of the PdfWriter.
         """
-        if pdf_path not in self.pdf_paths:
+        if not self._is_selected(pdf_path):
             print(f"PDF file {pdf_path} is not selected.")
             return None
         
         modified_writer = PdfWriter()
         try:
-            with open(pdf_path, 'rb') as file:
-                reader = PdfReader(file)
-                total_pages = len(reader.pages)
+            reader = self._get_reader(pdf_path)
+            total_pages = len(reader.pages)
 
-                # Process the page specifications
-                pages_to_delete = set() # Use a set to avoid duplicates
+            # Process the page specifications
+            with span('page-select'):
+                pages_to_delete = set(compile_page_specifications(page_specifications).resolve(total_pages, _source_name(pdf_path)))
 
-                if isinstance(page_specifications, int):
-                    # Single page (1-based)
-                    if 1 <= page_specifications <= total_pages:
-                        pages_to_delete.add(page_specifications - 1) # Convert to 0-indexed
-                    else:
-                        print(f"Page number {page_specifications} is out of range of {pdf_path}.")
-                elif isinstance(page_specifications, str):
-                    # Range of pages (1-based)
-                    if '-' in page_specifications:
-                        start, end = map(int, page_specifications.split('-'))
-                        for page in range(start - 1, end): # Convert start to 0-indexed
-                            if 0 <= page < total_pages:
-                                pages_to_delete.add(page)
-                            else:
-                                print(f"Page number {page + 1} is out of range for {pdf_path}.")
-                    else:
-                        # Single page is string (1-based)
-                        page_number = int(page_specifications)
-                        if 1 <= page_number <= total_pages:
-                            pages_to_delete.add(page_number -1) # Convert to 0-indexed
-                        else:
-                            print(f"Page number {page_number} is out of range for {pdf_path}.")
-                elif isinstance(page_specifications, list):
-                     # List of pages (1-based)
-                    for page_number in page_specifications:
-                        if 1 <= page_number <= total_pages:
-                            pages_to_delete.add(page_number - 1) # Convert to 0-indexed
-                        else:
-                            print(f"Page number {page_number} is out of range for {pdf_path}.")
-
-                # Add pages that are not deleted to the writer
+            if incremental:
+                def edit(incremental_writer):
+                    # Delete from the end so the remaining indexes stay valid
+                    for page in sorted(pages_to_delete, reverse=True):
+                        incremental_writer.delete_page(page)
+                return self._write_incremental(reader, pdf_path, output, edit,
+                    f"Original PDF file {_source_name(pdf_path)} has been modified.")
+
+            # Add pages that are not deleted to the writer
+            with span('copy'):
                 for page in range(total_pages):
                     if page not in pages_to_delete:
                         modified_writer.add_page(reader.pages[page])
             
             # Overwrite the original PDF file with the modified content
-            with open(pdf_path, 'wb') as output_file:
-                modified_writer.write(output_file)
-            print(f"Original PDF file {pdf_path} has been modified.")
-            return modified_writer
+            return self._write_modified(modified_writer, pdf_path, output, f"Original PDF file {_source_name(pdf_path)} has been modified.")
         except Exception as e:
             print(f"An error occurred while deleting pages: {e}")
             return None
 
-    def insert_into_pdf(self, target_pdf_path, source_pdf_path, page_number, insert_position):
+    @instrumented('insert')
+    def insert_into_pdf(self, target_pdf_path, source_pdf_path, page_number, insert_position, output=None, incremental=False):
         """
         Insert a page from one PDF into another PDF at a specified position.
 
-        :param target_pdf_path: Path to the target PDF file where the page will be inserted.
-        :param source_pdf_path: Path to the source PDF file from which the page will be taken.
+        :param target_pdf_path: Path to the target PDF file where the page will be inserted, or an in-memory PDF.
+        :param source_pdf_path: Path to the source PDF file from which the page will be taken, or an in-memory PDF.
         :param page_number: The page number (1-based) from the source PDF to insert.
         :param insert_position: The position (1-based) in the target PDF where the page will be inserted.
+        :param output: Filename or writable binary stream to write to instead of overwriting target_pdf_path.
+        :param incremental: Append an incremental update holding only the inserted page and the
+            changed page tree nodes instead of rewriting the document.
+        :return: The PdfWriter with the modified document, or the modified document as bytes
+            for an in-memory target without output. In incremental mode, the number of bytes
+            appended instead of the PdfWriter.
         """
-        if target_pdf_path not in self.pdf_paths:
+        if not self._is_selected(target_pdf_path):
             print(f"Target PDF file {target_pdf_path} is not selected.")
             return None
-        if source_pdf_path not in self.pdf_paths:
+        if not self._is_selected(source_pdf_path):
             print(f"Source PDF file {source_pdf_path} is not selected.")
             return None
 
         try:
-            with open(target_pdf_path, 'rb') as target_file, open(source_pdf_path, 'rb') as source_file:
-                target_reader = PdfReader(target_file)
-                source_reader = PdfReader(source_file)
+            target_reader = self._get_reader(target_pdf_path)
+            source_reader = self._get_reader(source_pdf_path)
 
-                total_target_pages = len(target_reader.pages)
-                total_source_pages = len(source_reader.pages)
+            total_target_pages = len(target_reader.pages)
+            total_source_pages = len(source_reader.pages)
 
-                # Convert to 0-based indexing
-                if 1 <= page_number <= total_source_pages and 1 <= insert_position <= total_target_pages + 1:
-                    page_to_insert = source_reader.pages[page_number - 1]
-                    modified_writer = PdfWriter()
+            # Convert to 0-based indexing
+            if incremental and 1 <= page_number <= total_source_pages and 1 <= insert_position <= total_target_pages + 1:
+                return self._write_incremental(target_reader, target_pdf_path, output,
+                    lambda incremental_writer: incremental_writer.insert_page(insert_position - 1, source_reader, page_number - 1),
+                    f"Inserted page {page_number} from {_source_name(source_pdf_path)} into {_source_name(target_pdf_path)} at position {insert_position}.")
+            elif 1 <= page_number <= total_source_pages and 1 <= insert_position <= total_target_pages + 1:
+                page_to_insert = source_reader.pages[page_number - 1]
+                modified_writer = PdfWriter()
 
+                with span('copy'):
                     # Add pages from the target PDF up to the insert position
                     for i in range(insert_position - 1):
                         modified_writer.add_page(target_reader.pages[i])
@@ -222,25 +951,31 @@ class PDFOperations:
                     for i in range(insert_position - 1, total_target_pages):
                         modified_writer.add_page(target_reader.pages[i])
 
-                    # Overwrite the target PDF with the modified content
-                    with open(target_pdf_path, 'wb') as output_file:
-                        modified_writer.write(output_file)
-                    print(f"Inserted page {page_number} from {source_pdf_path} into {target_pdf_path} at position {insert_position}.")
-                else:
-                    print(f"Invalid page number or insert position.")
+                # Overwrite the target PDF with the modified content
+                return self._write_modified(modified_writer, target_pdf_path, output,
+                    f"Inserted page {page_number} from {_source_name(source_pdf_path)} into {_source_name(target_pdf_path)} at position {insert_position}.")
+            else:
+                print(f"Invalid page number or insert position.")
         except Exception as e:
             print(f"An error occurred while inserting pages: {e}")
             return None
 
-    def rotate_pdf_pages(self, pdf_path, page_specifications, angle):
+    @instrumented('rotate')
+    def rotate_pdf_pages(self, pdf_path, page_specifications, angle, output=None, incremental=False):
             """
             Rotate specific pages in a PDF file by a given angle.
 
-            :param pdf_path: Path to the PDF file.
-            :param page_specifications: A single page number, a range (e.g., "1-5"), or a list of pages (1-based indexing).
+            :param pdf_path: Path to the PDF file, or an in-memory PDF.
+            :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
             :param angle: The angle to rotate the pages (90, 180, or 270 degrees).
+            :param output: Filename or writable binary stream to write to instead of overwriting pdf_path.
+            :param incremental: Append an incremental update holding only the rotated pages
+                instead of rewriting the document.
+            :return: The PdfWriter with the modified document, or the modified document as bytes
+                for an in-memory PDF without output. In incremental mode, the number of bytes
+                appended instead of the PdfWriter.
             """
-            if pdf_path not in self.pdf_paths:
+            if not self._is_selected(pdf_path):
                 print(f"PDF file {pdf_path} is not selected.")
                 return None
             
@@ -250,106 +985,116 @@ class PDFOperations:
 
             modified_writer = PdfWriter()
             try:
-                with open(pdf_path, 'rb') as file:
-                    reader = PdfReader(file)
-                    total_pages = len(reader.pages)
-
-                    # Process the page specifications
-                    pages_to_rotate = set()
-
-                    if isinstance(page_specifications, int):
-                        if 1 <= page_specifications <= total_pages:
-                            pages_to_rotate.add(page_specifications - 1)  # Convert to 0-indexed
-                        else:
-                            print(f"Page number {page_specifications} is out of range for {pdf_path}.")
-                    elif isinstance(page_specifications, str):
-                        if '-' in page_specifications:
-                            start, end = map(int, page_specifications.split('-'))
-                            for page in range(start - 1, end):  # Convert to 0-indexed
-                                if 0 <= page < total_pages:
-                                    pages_to_rotate.add(page)
-                                else:
-                                    print(f"Page number {page + 1} is out of range for {pdf_path}.")
-                        else:
-                            page_number = int(page_specifications)
-                            if 1 <= page_number <= total_pages:
-                                pages_to_rotate.add(page_number - 1)  # Convert to 0-indexed
-
-                    elif isinstance(page_specifications, list):
-                        for page_number in page_specifications:
-                            if 1 <= page_number <= total_pages:
-                                pages_to_rotate.add(page_number - 1)  # Convert to 0-indexed
-                            else:
-                                print(f"Page number {page_number} is out of range for {pdf_path}.")
-
-                    # Add pages to the writer, rotating specified pages
+                reader = self._get_reader(pdf_path)
+                total_pages = len(reader.pages)
+
+                # Process the page specifications
+                with span('page-select'):
+                    pages_to_rotate = set(compile_page_specifications(page_specifications).resolve(total_pages, _source_name(pdf_path)))
+
+                if incremental:
+                    def edit(incremental_writer):
+                        for page in pages_to_rotate:
+                            incremental_writer.rotate_page(page, angle)
+                    return self._write_incremental(reader, pdf_path, output, edit,
+                        f"Rotated specified pages in {_source_name(pdf_path)} by {angle} degrees.")
+
+                # Rotate the writer's copy so the cached reader is left untouched
+                with span('copy'):
                     for page in range(total_pages):
+                        written_page = modified_writer.add_page(reader.pages[page])
                         if page in pages_to_rotate:
-                            reader.pages[page].rotate_clockwise(angle)  # Rotate the page
-                        modified_writer.add_page(reader.pages[page])
+                            written_page.rotate(angle)  # Rotate the page clockwise
 
                 # Overwrite the original PDF file with the modified content
-                with open(pdf_path, 'wb') as output_file:
-                    modified_writer.write(output_file)
-                print(f"Rotated specified pages in {pdf_path} by {angle} degrees.")
-                return modified_writer
+                return self._write_modified(modified_writer, pdf_path, output,
+                    f"Rotated specified pages in {_source_name(pdf_path)} by {angle} degrees.")
             except Exception as e:
                 print(f"An error occurred while rotating pages: {e}")
                 return None
 
-    def convert_pdf_to_word(self, pdf_path, docx_path, page_specifications=None):
+    def plan_edits(self, pdf_path):
+        """
+        Start a deferred edit plan against a PDF file.
+
+        Deletes, rotations, inserts and extractions queued on the plan are
+        applied together by its commit() method with one read of every
+        involved document and one atomic write of the edited file.
+
+        :param pdf_path: Path to the PDF file to edit, or an in-memory PDF (committing
+            the plan then returns the edited document as bytes).
+        :return: An EditPlan, or None if the file is not selected.
+        """
+        if not self._is_selected(pdf_path):
+            print(f"PDF file {pdf_path} is not selected.")
+            return None
+        return EditPlan(self, pdf_path)
+
+    @instrumented('convert')
+    def convert_pdf_to_word(self, pdf_path, docx_path, page_specifications=None, workers=1, shard_size=None):
         """
         Convert a PDF file to a Word document.
 
-        :param pdf_path: Path to the PDF file to convert.
-        :param docx_path: Path to save the converted Word document.
-        :param page_specifications: A single page number, a range (e.g., "1-5"), or a list of pages (1-based indexing).
+        With more than one worker the pages are split into shards whose layout
+        is parsed in parallel worker processes; the parsed shards are then
+        restored into one converter and written out in page order.
+
+        :param pdf_path: Path to the PDF file to convert, or an in-memory PDF.
+        :param docx_path: Path or writable binary stream to save the converted Word document.
+        :param page_specifications: A single page number, a range (e.g., "1-5", "20-", "1-10,15"), or a list of pages (1-based indexing; see PageSelection).
+        :param workers: Number of worker processes used to parse pages (1 converts in-process).
+        :param shard_size: Pages per shard (defaults to an even split across the workers).
+        :return: The path of the Word document, or None if nothing was converted.
         """
-        if pdf_path not in self.pdf_paths:
+        if not self._is_selected(pdf_path):
             print(f"PDF file {pdf_path} is not selected.")
             return None
 
         try:
-            cv = Converter(pdf_path)
+            with span('open'):
+                cv = _open_converter(pdf_path)
+                total_pages = len(cv.fitz_doc)
+            if _is_path(pdf_path):
+                add_count('bytes_read', os.path.getsize(pdf_path))
 
-            if page_specifications is None:
-                # Convert the entire document
-                cv.convert(docx_path)  # All pages by default
-                print(f"Converted entire PDF to {docx_path}.")
-            else:
-                pages_to_convert = []
+            with span('page-select'):
+                if page_specifications is None:
+                    pages_to_convert = list(range(total_pages))
+                else:
+                    pages_to_convert = list(compile_page_specifications(page_specifications).resolve(total_pages, _source_name(pdf_path)))
 
-                if isinstance(page_specifications, int):
-                    if 1 <= page_specifications <= len(cv.pages):
-                        pages_to_convert.append(page_specifications - 1)  # Convert to 0-indexed
-                    else:
-                        print(f"Page number {page_specifications} is out of range for {pdf_path}.")
-                elif isinstance(page_specifications, str):
-                    if '-' in page_specifications:
-                        start, end = map(int, page_specifications.split('-'))
-                        for page in range(start - 1, end):  # Convert to 0-indexed
-                            if 0 <= page < len(cv.pages):
-                                pages_to_convert.append(page)
-                            else:
-                                print(f"Page number {page + 1} is out of range for {pdf_path}.")
-                    else:
-                        page_number = int(page_specifications)
-                        if 1 <= page_number <= len(cv.pages):
-                            pages_to_convert.append(page_number - 1)  # Convert to 0-indexed
-
-                elif isinstance(page_specifications, list):
-                    for page_number in page_specifications:
-                        if 1 <= page_number <= len(cv.pages):
-                            pages_to_convert.append(page_number - 1)  # Convert to 0-indexed
-                        else:
-                            print(f"Page number {page_number} is out of range for {pdf_path}.")
-
-                # Convert specified pages
-                if pages_to_convert:
+            if not pages_to_convert:
+                cv.close()
+                return None
+
+            with span('convert'):
+                if workers > 1 and len(pages_to_convert) > 1:
+                    # Parse shards in parallel, then stitch them back in page order
+                    shard_size = shard_size or -(-len(pages_to_convert) // workers)
+                    shards = [pages_to_convert[i:i + shard_size] for i in range(0, len(pages_to_convert), shard_size)]
+                    settings = cv.default_settings
+                    # Workers need a path or plain bytes they can open themselves
+                    pdf_source = pdf_path if _is_path(pdf_path) else _buffer_bytes(pdf_path)
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        for parsed_shard in executor.map(_parse_page_shard, [pdf_source] * len(shards), shards):
+                            cv.restore(parsed_shard)
+                    cv.make_docx(docx_path, **settings)
+                elif page_specifications is None:
+                    # Convert the entire document
+                    cv.convert(docx_path)  # All pages by default
+                else:
                     cv.convert(docx_path, pages=pages_to_convert)
-                    print(f"Converted specified pages {page_specifications} from {pdf_path} to {docx_path}.")
+            add_count('pages', len(pages_to_convert))
+            if _is_path(docx_path):
+                add_count('bytes_written', os.path.getsize(docx_path))
+
+            if page_specifications is None:
+                print(f"Converted entire PDF to {_source_name(docx_path)}.")
+            else:
+                print(f"Converted specified pages {page_specifications} from {_source_name(pdf_path)} to {_source_name(docx_path)}.")
 
             cv.close()
+            return docx_path
         except Exception as e:
             print(f"An error occurred while converting PDF to Word: {e}")
             return None
@@ -368,6 +1113,9 @@ if __name__ == "__main__":
     # Extract a range pages and save
     #extracted_writer_single = pdf_operations.extract_pdf_pages('Maths.pdf', "1-5", "extracted.pdf")
 
+    # Extract with bounded memory, without keeping a PdfWriter around
+    #pdf_operations.extract_pdf_pages('Drawings.pdf', "1-100", "extracted.pdf", low_memory=True)
+
     # Extract non-contigeous
     #extracted_writer_single = pdf_operations.extract_pdf_pages('Maths.pdf', [1, 3, 5], "extracted.pdf")
 
@@ -377,6 +1125,25 @@ if __name__ == "__main__":
     # Merge the selected PDF files into a single file
     # pdf_operations.merge_pdf_files('ISC_Notes.pdf')
 
+    # Merge while leaving out repeated pages (e.g. the same cover sheet), reusing fingerprints across runs
+    # indexed_operations = PDFOperations(fingerprint_index=FingerprintIndex('page_index.json'))
+    # indexed_operations.select_pdf_files('statements/')
+    # indexed_operations.find_duplicate_pages()
+    # indexed_operations.merge_pdf_files('statements.pdf', skip_duplicates=True)
+
+    # ----------------------------------------------------------------------
+    # SPLIT
+    # ----------------------------------------------------------------------
+
+    # Burst every page into its own file
+    # pdf_operations.split_pdf('statements.pdf', every=1, output_dir='burst')
+
+    # Split by explicit ranges
+    # pdf_operations.split_pdf('statements.pdf', ranges=["1-3", "4-10", "11-"])
+
+    # Split at the top-level bookmarks
+    # pdf_operations.split_pdf('statements.pdf', by_bookmarks=True)
+
     # ----------------------------------------------------------------------
     # DELETE
     # ----------------------------------------------------------------------
@@ -413,6 +1180,48 @@ if __name__ == "__main__":
     # Rotate non-contiguous pages in merged_output.pdf
     # pdf_operations.rotate_pdf_pages('merged_output.pdf', [1, 3], 270)
     
+    # Append only the rotated page to a large file instead of rewriting it
+    # pdf_operations.rotate_pdf_pages('merged_output.pdf', 1, 90, incremental=True)
+
+    # ----------------------------------------------------------------------
+    # EDIT PLAN
+    # ----------------------------------------------------------------------
+
+    # Queue several edits and apply them with a single read and write
+    # plan = pdf_operations.plan_edits('merged_output.pdf')
+    # plan.delete("1-2").rotate(1, 90).insert('file2.pdf', 1, 2).extract([1, 2], 'extracted.pdf')
+    # plan.commit()
+
+    # ----------------------------------------------------------------------
+    # IN-MEMORY INPUT AND OUTPUT
+    # ----------------------------------------------------------------------
+
+    # Operations accept bytes, bytearray, memoryview or binary streams instead of paths
+    # rotated_bytes = pdf_operations.rotate_pdf_pages(uploaded_bytes, 1, 90)
+    # output = io.BytesIO()
+    # pdf_operations.extract_pdf_pages(uploaded_bytes, "1-3", output)
+
+    # ----------------------------------------------------------------------
+    # OPTIMIZED OUTPUT
+    # ----------------------------------------------------------------------
+
+    # Store the logos and fonts shared by merged statements once, and compress uncompressed streams
+    # optimized_operations = PDFOperations(optimize=True, compress_level=6)
+    # optimized_operations.select_pdf_files('statements/*.pdf')
+    # optimized_operations.merge_pdf_files('statements.pdf')
+
+    # ----------------------------------------------------------------------
+    # INSTRUMENTATION
+    # ----------------------------------------------------------------------
+
+    # Send every operation's timings to a metrics system
+    # pdf_operations.instrumentation.add_hook(lambda record: print(record['operation'], record['seconds'], record['spans']))
+
+    # Profile a single call with cProfile and tracemalloc
+    # pdf_operations.instrumentation.capture_next_call()
+    # pdf_operations.merge_pdf_files('merged_output.pdf')
+    # pdf_operations.instrumentation.last_record['profile'].sort_stats('cumulative').print_stats(20)
+
     # ----------------------------------------------------------------------
     # Convert PDF document to Word
     # ----------------------------------------------------------------------
@@ -422,7 +1231,23 @@ if __name__ == "__main__":
     # Convert specific pages (1-based indexing)
     # pdf_operations.convert_pdf_to_word('file1.pdf', 'file1_partial.docx', page_specifications="1-3")
 
+    # Convert with the page layout parsed by 4 worker processes
+    # pdf_operations.convert_pdf_to_word('file1.pdf', 'file1.docx', workers=4)
+
     # Convert non-contiguous pages
     # pdf_operations.convert_pdf_to_word('file1.pdf', 'file1_selected.docx', page_specifications=[1, 3, 5])
+
+    # ----------------------------------------------------------------------
+    # RESUMABLE JOBS
+    # ----------------------------------------------------------------------
+
+    # Convert a huge document in checkpointed chunks; running it again after a crash resumes
+    # from the last completed chunk, and failing pages are reported instead of aborting
+    # from pdf_jobs import run_convert_job, run_merge_job
+    # record = run_convert_job(pdf_operations, 'ISC_Notes.pdf', 'file1.docx', 'convert_job', chunk_size=50)
+    # print(record['failures'])
+
+    # Merge the selected files in checkpointed chunks of 50 files
+    # run_merge_job(pdf_operations, 'merged_output.pdf', 'merge_job', chunk_size=50)
     
 
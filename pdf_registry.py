@@ -0,0 +1,208 @@
+import glob
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from pypdf import PdfReader
+
+def normalize_path(path):
+    """
+    Normalize a path for use as a lookup key.
+
+    :param path: A filesystem path.
+    :return: The absolute, case-normalized path.
+    """
+    return os.path.normcase(os.path.abspath(path))
+
+def expand_paths(paths):
+    """
+    Expand directories and glob patterns into the files they contain.
+
+    An existing file is taken literally even if its name has glob characters
+    (e.g. "scan[1].pdf"). A directory expands to the PDF files found in it
+    recursively. Directory and glob matches are sorted by name; everything
+    else keeps the order given. In-memory PDFs are passed through.
+
+    :param paths: Paths, directories, glob patterns or in-memory PDFs.
+    :return: A tuple (list of the expanded entries, list of the glob patterns that match no file).
+    """
+    expanded = []
+    unmatched = []
+    for path in paths:
+        if _is_in_memory(path):
+            expanded.append(path)
+        elif glob.has_magic(os.fspath(path)) and not os.path.exists(path):
+            matches = sorted(glob.glob(os.fspath(path), recursive=True))
+            if not matches:
+                unmatched.append(path)
+            expanded.extend(matches)
+        elif os.path.isdir(path):
+            expanded.extend(sorted(glob.glob(os.path.join(glob.escape(os.fspath(path)), '**', '*.[pP][dD][fF]'), recursive=True)))
+        else:
+            expanded.append(path)
+    return expanded, unmatched
+
+def _is_in_memory(source):
+    return isinstance(source, (bytes, bytearray, memoryview)) or hasattr(source, 'read')
+
+class FileRegistry:
+    """
+    Ordered registry of selected PDF files, indexed on the normalized path.
+
+    Membership tests are O(1) dictionary lookups, selecting the same file
+    twice (under any spelling of its path) keeps a single entry, and the
+    metadata of each file is cached alongside it. In-memory PDFs can be
+    registered too; they are kept in selection order but never deduplicated.
+    """
+
+    def __init__(self):
+        self._entries = {} # key -> metadata dictionary, in selection order
+        self._keys = {} # path as given -> key, so repeated lookups skip normalization
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        for entry in self._entries.values():
+            yield entry['path']
+
+    def __contains__(self, path):
+        return self._key(path) in self._entries
+
+    def __getstate__(self):
+        # The alias index is rebuilt lazily; only the entries need pickling
+        return {'_entries': self._entries}
+
+    def __setstate__(self, state):
+        self._entries = state['_entries']
+        self._keys = {}
+
+    def copy(self):
+        """
+        Get a shallow copy of the registry.
+
+        :return: A FileRegistry with the same entries.
+        """
+        registry = FileRegistry()
+        registry._entries = dict(self._entries)
+        return registry
+
+    def add(self, path, file_stat=None):
+        """
+        Register a PDF file (or an in-memory PDF).
+
+        :param path: Path to the PDF file, or an in-memory PDF.
+        :param file_stat: The file's os.stat result, if already known.
+        :return: True if the file was added, False if it is invalid or already registered.
+        """
+        if _is_in_memory(path):
+            self._entries[('memory', id(path))] = {'path': path}
+            return True
+        key = self._key(path)
+        if key in self._entries:
+            return False
+        if file_stat is None:
+            file_stat = _stat_pdf(path)
+        if file_stat is None:
+            return False
+        self._entries[key] = {
+            'path': path,
+            'size': file_stat.st_size,
+            'mtime': file_stat.st_mtime,
+            'page_count': None,
+            'encrypted': None,
+        }
+        return True
+
+    def add_many(self, paths, max_workers=8):
+        """
+        Register many PDF files, expanding directories and glob patterns.
+
+        Files are stat'ed concurrently by a thread pool; they are registered
+        in the order given (directory and glob matches sorted by name).
+
+        :param paths: Paths, directories, glob patterns or in-memory PDFs.
+        :param max_workers: Number of threads gathering file stats.
+        :return: List of the entries that could not be added because they are not PDF files,
+            including glob patterns that match no file.
+        """
+        candidates, invalid = expand_paths(paths)
+
+        # Skip files that are already registered before paying for a stat
+        to_stat = [path for path in candidates if not _is_in_memory(path) and path not in self]
+        if len(to_stat) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                stats = dict(zip(to_stat, executor.map(_stat_pdf, to_stat)))
+        else:
+            stats = {path: _stat_pdf(path) for path in to_stat}
+
+        for path in candidates:
+            if _is_in_memory(path):
+                self.add(path)
+            elif path in stats:
+                if stats[path] is None:
+                    invalid.append(path)
+                else:
+                    self.add(path, stats.pop(path))
+        return invalid
+
+    def remove(self, path):
+        """
+        Unregister a PDF file.
+
+        :param path: Path to the PDF file.
+        """
+        self._entries.pop(self._key(path), None)
+
+    def clear(self):
+        """
+        Unregister every file.
+        """
+        self._entries.clear()
+        self._keys.clear()
+
+    def get_info(self, path):
+        """
+        Get the cached metadata of a registered file.
+
+        Size and mtime are refreshed if the file changed on disk; the page
+        count and encryption flag are read from the file on first use and
+        cached until it changes.
+
+        :param path: Path to the PDF file.
+        :return: A dictionary with path, size, mtime, page_count and encrypted, or None if not registered.
+        """
+        entry = self._entries.get(self._key(path))
+        if entry is None or 'size' not in entry:
+            return entry
+        file_stat = os.stat(entry['path'])
+        if (file_stat.st_size, file_stat.st_mtime) != (entry['size'], entry['mtime']):
+            entry.update(size=file_stat.st_size, mtime=file_stat.st_mtime, page_count=None, encrypted=None)
+        if entry['encrypted'] is None:
+            reader = PdfReader(entry['path'])
+            entry['encrypted'] = reader.is_encrypted
+            entry['page_count'] = None if reader.is_encrypted else len(reader.pages)
+        return dict(entry)
+
+    def _key(self, path):
+        if _is_in_memory(path):
+            return ('memory', id(path))
+        key = self._keys.get(path)
+        if key is None:
+            key = self._keys[path] = normalize_path(path)
+        return key
+
+def _stat_pdf(path):
+    """
+    Stat a file if it is a regular file with a .pdf extension.
+
+    :param path: A filesystem path.
+    :return: The os.stat result, or None if the path is not a PDF file.
+    """
+    if not os.fspath(path).lower().endswith('.pdf'):
+        return None
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return file_stat if stat.S_ISREG(file_stat.st_mode) else None
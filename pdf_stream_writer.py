@@ -0,0 +1,361 @@
+import io
+import mmap
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    StreamObject,
+)
+
+# Object numbers reserved for the catalog and the page tree root
+_CATALOG = 1
+_PAGES = 2
+
+class StreamingPdfWriter:
+    """
+    Write pages to a PDF file object by object, as they are copied.
+
+    Unlike PdfWriter, which keeps every copied object in memory until the
+    whole document is serialized, each page and the objects it references
+    are written to the output as soon as the page is added. Only the object
+    number mapping and the xref offsets are kept, so memory stays bounded by
+    the largest page rather than the whole document.
+    """
+
+    def __init__(self, output_file):
+        """
+        :param output_file: A binary file object opened for writing.
+        """
+        self.output_file = output_file
+        self.bytes_written = 0
+        self._offsets = {}
+        self._next_number = _PAGES + 1
+        self._page_refs = []
+        self._mapping = {} # (reader id, generation, idnum) -> new object number
+        self._pending = []
+        self._current_page = None
+        self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def add_page(self, reader, page_index):
+        """
+        Copy a page and every object it references to the output.
+
+        :param reader: The PdfReader the page comes from.
+        :param page_index: 0-based index of the page in reader.
+        """
+        page_number = self._write_page(reader, page_index, IndirectObject(_PAGES, 0, None))
+        self._page_refs.append(IndirectObject(page_number, 0, None))
+        # Drop the objects pypdf resolved for this page; they have been written
+        reader.resolved_objects.clear()
+        self.output_file.flush()
+
+    def close(self):
+        """
+        Write the page tree, catalog, xref table and trailer.
+
+        :return: The total number of bytes written.
+        """
+        self._write_object(_PAGES, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(self._page_refs),
+            NameObject("/Count"): NumberObject(len(self._page_refs)),
+        }))
+        self._write_object(_CATALOG, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(_PAGES, 0, None),
+        }))
+
+        xref_offset = self.bytes_written
+        size = self._next_number
+        entries = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        for number in range(1, size):
+            entries.append(b"%010d 00000 n \n" % self._offsets[number])
+        entries.append(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, _CATALOG, xref_offset))
+        self._write(b"".join(entries))
+        self.output_file.flush()
+        return self.bytes_written
+
+    def _write_page(self, reader, page_index, parent):
+        """
+        Write a copy of a page, attached to parent, and every object it references.
+
+        :param reader: The PdfReader the page comes from.
+        :param page_index: 0-based index of the page in reader.
+        :param parent: IndirectObject of the page tree node the copy belongs to.
+        :return: The object number of the copy.
+        """
+        page = reader.pages[page_index]
+        reference = page.indirect_reference
+        self._current_page = (id(reader), reference.generation, reference.idnum)
+        page_number = self._assign(self._current_page)
+
+        page_copy = DictionaryObject()
+        for key, value in page.items():
+            if key != "/Parent":
+                page_copy[NameObject(key)] = self._copy(reader, value)
+        page_copy[NameObject("/Parent")] = parent
+        self._write_object(page_number, page_copy)
+
+        while self._pending:
+            number, source = self._pending.pop()
+            self._write_object(number, self._copy(reader, source))
+
+        self._current_page = None
+        return page_number
+
+    def _assign(self, key):
+        number = self._mapping.get(key)
+        if number is None:
+            number = self._next_number
+            self._next_number += 1
+            self._mapping[key] = number
+        return number
+
+    def _copy(self, reader, value):
+        if isinstance(value, IndirectObject):
+            key = (id(reader), value.generation, value.idnum)
+            if key in self._mapping:
+                return IndirectObject(self._mapping[key], 0, None)
+            target = value.get_object()
+            if isinstance(target, DictionaryObject) and target.get("/Type") == "/Page" and key != self._current_page:
+                return NullObject() # Links to pages that are not copied
+            number = self._assign(key)
+            self._pending.append((number, target))
+            return IndirectObject(number, 0, None)
+        if isinstance(value, StreamObject):
+            stream_copy = value.__class__()
+            stream_copy._data = value._data
+            for key, item in value.items():
+                if key != "/Length":
+                    stream_copy[NameObject(key)] = self._copy(reader, item)
+            return stream_copy
+        if isinstance(value, DictionaryObject):
+            return DictionaryObject({NameObject(key): self._copy(reader, item) for key, item in value.items()})
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self._copy(reader, item) for item in value)
+        return value
+
+    def _write_object(self, number, obj, generation=0):
+        self._offsets[number] = self.bytes_written
+        self._write(b"%d %d obj\n" % (number, generation))
+        start = self.output_file.tell()
+        obj.write_to_stream(self.output_file)
+        self.bytes_written += self.output_file.tell() - start
+        self._write(b"\nendobj\n")
+
+    def _write(self, data):
+        self.output_file.write(data)
+        self.bytes_written += len(data)
+
+class IncrementalPdfWriter(StreamingPdfWriter):
+    """
+    Append an incremental update to an existing PDF document.
+
+    As the PDF specification allows, only the objects that change are written
+    after the original data: the edited pages, the page tree nodes whose
+    /Kids or /Count change, and pages copied in from other documents. They are
+    followed by an xref section covering just those objects and a trailer
+    that chains to the previous xref with /Prev. The original bytes are never
+    rewritten, so a small edit to a large file costs kilobytes of I/O.
+
+    Page indexes given to the edit methods refer to the document as left by
+    the previous edits.
+    """
+
+    def __init__(self, reader, output_file):
+        """
+        :param reader: The PdfReader of the original document.
+        :param output_file: A binary file object positioned at the end of the original data.
+        """
+        if reader.is_encrypted:
+            raise ValueError("Incremental updates of encrypted PDF files are not supported.")
+        self.reader = reader
+        self.output_file = output_file
+        # Offsets in the xref are counted from the start of the original data
+        self._base = output_file.tell()
+        self.bytes_written = self._base
+        self._offsets = {}
+        self._generations = {}
+        self._next_number = int(reader.trailer["/Size"])
+        self._mapping = {}
+        self._pending = []
+        self._current_page = None
+        self._modified = {} # object number -> edited copy of an original object
+        self._parents = {} # object number of an inserted page -> its page tree node
+        self._previous_xref = _find_startxref(reader.stream)
+        self.page_refs = [page.indirect_reference for page in reader.pages]
+        self.pages_written = 0
+        self._write(b"\n")
+
+    def rotate_page(self, page_index, angle):
+        """
+        Rotate a page of the original document clockwise.
+
+        :param page_index: 0-based index of the page.
+        :param angle: The angle to rotate the page by (a multiple of 90 degrees).
+        """
+        reference = self.page_refs[page_index]
+        # /Rotate is inheritable: a page without its own takes it from its page tree ancestors
+        rotation = self._inherited(reference, "/Rotate", 0)
+        page = self._modify(reference)
+        page[NameObject("/Rotate")] = NumberObject((rotation + angle) % 360)
+        self.pages_written += 1
+
+    def delete_page(self, page_index):
+        """
+        Remove a page from the page tree.
+
+        The page object itself stays in the original data, unreferenced.
+
+        :param page_index: 0-based index of the page.
+        """
+        reference = self.page_refs.pop(page_index)
+        parent_reference = self._parent_of(reference)
+        parent = self._modify(parent_reference)
+        parent[NameObject("/Kids")] = ArrayObject(kid for kid in parent["/Kids"] if kid.idnum != reference.idnum)
+        self._adjust_count(parent_reference, -1)
+
+    def insert_page(self, position, source_reader, page_index):
+        """
+        Copy a page from another document (with every object it references) into the page tree.
+
+        :param position: 0-based index the page will have in the edited document.
+        :param source_reader: The PdfReader the page comes from.
+        :param page_index: 0-based index of the page in source_reader.
+        """
+        if position < len(self.page_refs):
+            anchor, after = self.page_refs[position], 0
+        elif self.page_refs:
+            anchor, after = self.page_refs[-1], 1
+        else:
+            anchor, after = None, 0
+        if anchor is not None:
+            parent_reference = self._parent_of(anchor)
+        else:
+            parent_reference = self.reader.trailer["/Root"].raw_get("/Pages")
+
+        number = self._write_page(source_reader, page_index, parent_reference)
+        reference = IndirectObject(number, 0, None)
+        parent = self._modify(parent_reference)
+        kids = list(parent["/Kids"])
+        if anchor is None:
+            kids.append(reference)
+        else:
+            kids.insert([kid.idnum for kid in kids].index(anchor.idnum) + after, reference)
+        parent[NameObject("/Kids")] = ArrayObject(kids)
+        self._adjust_count(parent_reference, 1)
+        self._parents[number] = parent_reference
+        self.page_refs.insert(position, reference)
+        self.pages_written += 1
+
+    def close(self):
+        """
+        Write the edited objects, the xref section and the trailer.
+
+        :return: The number of bytes appended to the original data.
+        """
+        if not self._modified and not self._offsets:
+            return self.bytes_written - self._base
+        for number, obj in self._modified.items():
+            self._write_object(number, obj, self._generations[number])
+
+        xref_offset = self.bytes_written
+        numbers = sorted(self._offsets)
+        # Restating the head of the free list keeps readers that expect a section starting at 0 happy
+        entries = [b"xref\n0 1\n0000000000 65535 f \n"]
+        start = 0
+        while start < len(numbers):
+            # One subsection per run of consecutive object numbers
+            end = start
+            while end + 1 < len(numbers) and numbers[end + 1] == numbers[end] + 1:
+                end += 1
+            entries.append(b"%d %d\n" % (numbers[start], end - start + 1))
+            for number in numbers[start:end + 1]:
+                entries.append(b"%010d %05d n \n" % (self._offsets[number], self._generations.get(number, 0)))
+            start = end + 1
+
+        trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(self._next_number),
+            NameObject("/Root"): self.reader.trailer.raw_get("/Root"),
+            NameObject("/Prev"): NumberObject(self._previous_xref),
+        })
+        for key in ("/Info", "/ID"):
+            if key in self.reader.trailer:
+                trailer[NameObject(key)] = self.reader.trailer.raw_get(key)
+        trailer_data = io.BytesIO()
+        trailer.write_to_stream(trailer_data)
+        entries.append(b"trailer\n" + trailer_data.getvalue() + b"\nstartxref\n%d\n%%%%EOF\n" % xref_offset)
+        self._write(b"".join(entries))
+        self.output_file.flush()
+        return self.bytes_written - self._base
+
+    def _object(self, reference):
+        if reference.idnum in self._modified:
+            return self._modified[reference.idnum]
+        return reference.get_object()
+
+    def _modify(self, reference):
+        # Edit a shallow copy, so the reader (which may be cached) is left untouched
+        obj = self._modified.get(reference.idnum)
+        if obj is None:
+            obj = self._modified[reference.idnum] = DictionaryObject(reference.get_object())
+            self._generations[reference.idnum] = reference.generation
+        return obj
+
+    def _inherited(self, reference, key, default):
+        obj = self._object(reference)
+        while key not in obj:
+            if "/Parent" not in obj:
+                return default
+            obj = self._object(obj.raw_get("/Parent"))
+        return obj[key]
+
+    def _parent_of(self, reference):
+        if reference.idnum in self._parents:
+            return self._parents[reference.idnum]
+        return self._object(reference).raw_get("/Parent")
+
+    def _adjust_count(self, node_reference, delta):
+        # /Count holds the number of pages below a node, so every ancestor changes too
+        while node_reference is not None:
+            node = self._modify(node_reference)
+            node[NameObject("/Count")] = NumberObject(node["/Count"] + delta)
+            node_reference = node.raw_get("/Parent") if "/Parent" in node else None
+
+def _find_startxref(stream):
+    """
+    Find the offset of the last xref section of a PDF.
+
+    :param stream: A seekable binary stream over the PDF data.
+    :return: The offset given by the last startxref keyword.
+    """
+    stream.seek(0, io.SEEK_END)
+    stream.seek(max(0, stream.tell() - 1024))
+    tail = stream.read()
+    position = tail.rfind(b"startxref")
+    if position < 0:
+        raise ValueError("startxref not found; the file is not a valid PDF.")
+    return int(tail[position + len(b"startxref"):].split()[0])
+
+def open_mmap_reader(pdf_path):
+    """
+    Open a PdfReader over a read-only memory map of the file.
+
+    The file contents are paged in by the operating system on demand instead
+    of being read into the Python heap.
+
+    :param pdf_path: Path to the PDF file.
+    :return: A tuple (reader, mapping); close the mapping when done with the reader.
+    """
+    with open(pdf_path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return PdfReader(mapping), mapping
+    except BaseException:
+        mapping.close()
+        raise
@@ -0,0 +1,52 @@
+import pytest
+
+from page_selection import PageSelectionError, compile_page_specifications
+
+# (specification, total pages, expected 0-based indices)
+VALID = [
+    (3, 5, [2]),
+    (-1, 5, [4]),
+    ("1-3", 5, [0, 1, 2]),
+    ("4-", 5, [3, 4]),
+    ("-2-", 5, [3, 4]),
+    ("1-5:2", 5, [0, 2, 4]),
+    ("1-2,4", 5, [0, 1, 3]),
+    ("2-3,1-2", 5, [0, 1, 2]),
+    ([1, "4-5"], 5, [0, 3, 4]),
+    ("5--1", 5, [4]),
+    ("3-3", 5, [2]),
+]
+
+# (specification, total pages, expected invalid_pages, expected reversed_ranges)
+OUT_OF_RANGE_OR_REVERSED = [
+    (6, 5, [(6, 6)], []),
+    ("4-7", 5, [(6, 7)], []),
+    ("7-", 5, [(7, 7)], []),
+    (-6, 5, [(-6, -6)], []),
+    ("4-2", 5, [], [(4, 2)]),
+    ("3-1:2", 5, [], [(3, 1)]),
+    ("-1--3", 5, [], [(5, 3)]),
+    ("9,4-2", 5, [(9, 9)], [(4, 2)]),
+]
+
+MALFORMED = [0, "0", "1-0", "1-3:0", "a", "1-2-3", "", None, True, 1.5, [True, 2], [1.0, 2], (1, [2])]
+
+@pytest.mark.parametrize("specification, total_pages, expected", VALID)
+def test_resolve(specification, total_pages, expected):
+    assert list(compile_page_specifications(specification).resolve(total_pages)) == expected
+
+@pytest.mark.parametrize("specification, total_pages, invalid_pages, reversed_ranges", OUT_OF_RANGE_OR_REVERSED)
+def test_resolve_reports_every_invalid_term(specification, total_pages, invalid_pages, reversed_ranges):
+    with pytest.raises(PageSelectionError) as error:
+        compile_page_specifications(specification).resolve(total_pages, "d.pdf")
+    assert error.value.invalid_pages == invalid_pages
+    assert error.value.reversed_ranges == reversed_ranges
+    assert error.value.total_pages == total_pages
+    assert "d.pdf" in str(error.value)
+
+@pytest.mark.parametrize("specification", MALFORMED)
+def test_compile_rejects_malformed(specification):
+    # Compiling a valid, equal-comparing specification first must not let a malformed one through
+    compile_page_specifications([1, 2])
+    with pytest.raises(PageSelectionError):
+        compile_page_specifications(specification)
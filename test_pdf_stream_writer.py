@@ -0,0 +1,108 @@
+import io
+
+import pytest
+from pypdf import PdfReader
+
+from pdf_procedures import PDFOperations
+from pdf_stream_writer import IncrementalPdfWriter, StreamingPdfWriter
+
+_CONTENT = b"BT /F1 12 Tf 10 10 Td (Hi) Tj ET"
+
+def _build_pdf(objects):
+    # Serialize numbered object bodies (None for the content stream) with a classic xref table
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        if body is None:
+            body = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(_CONTENT), _CONTENT)
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref_offset = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    output.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return output.getvalue()
+
+@pytest.fixture
+def inherited_pdf(tmp_path):
+    """
+    A two-page document whose first page inherits /Rotate 90, /MediaBox and
+    /Resources from the page tree root; the second page sets /Rotate 0 itself.
+    """
+    path = tmp_path / "inherited.pdf"
+    path.write_bytes(_build_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R 4 0 R] /Count 2 /Rotate 90 /MediaBox [0 0 200 300]"
+        b" /Resources << /Font << /F1 6 0 R >> >> >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 5 0 R >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 5 0 R /Rotate 0 >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]))
+    return path
+
+def _append_update(path, edit):
+    reader = PdfReader(path)
+    with open(path, 'r+b') as output_file:
+        output_file.seek(0, io.SEEK_END)
+        incremental_writer = IncrementalPdfWriter(reader, output_file)
+        edit(incremental_writer, reader)
+        return incremental_writer.close()
+
+def test_streaming_writer_keeps_inherited_attributes(inherited_pdf):
+    reader = PdfReader(inherited_pdf)
+    output = io.BytesIO()
+    streaming_writer = StreamingPdfWriter(output)
+    for page in (1, 0):
+        streaming_writer.add_page(reader, page)
+    bytes_written = streaming_writer.close()
+
+    assert bytes_written == len(output.getvalue())
+    pages = PdfReader(io.BytesIO(output.getvalue()), strict=True).pages
+    assert [page.rotation for page in pages] == [0, 90]
+    assert [list(page.mediabox) for page in pages] == [[0, 0, 200, 300]] * 2
+    assert "/F1" in pages[1]["/Resources"]["/Font"]
+
+def test_incremental_rotate_adds_to_inherited_rotation(inherited_pdf):
+    _append_update(inherited_pdf, lambda incremental_writer, _: incremental_writer.rotate_page(0, 90))
+    assert [page.rotation for page in PdfReader(inherited_pdf, strict=True).pages] == [180, 0]
+
+    def rotate_twice(incremental_writer, _):
+        incremental_writer.rotate_page(0, 90)
+        incremental_writer.rotate_page(0, 90)
+    _append_update(inherited_pdf, rotate_twice)
+    assert [page.rotation for page in PdfReader(inherited_pdf, strict=True).pages] == [0, 0]
+
+def test_incremental_delete_and_insert(inherited_pdf, tmp_path):
+    source = tmp_path / "source.pdf"
+    source.write_bytes(inherited_pdf.read_bytes())
+    original_size = inherited_pdf.stat().st_size
+
+    def edit(incremental_writer, _):
+        incremental_writer.delete_page(1)
+        incremental_writer.insert_page(0, PdfReader(source), 1)
+    bytes_appended = _append_update(inherited_pdf, edit)
+
+    assert inherited_pdf.stat().st_size == original_size + bytes_appended
+    pages = PdfReader(inherited_pdf, strict=True).pages
+    assert [page.rotation for page in pages] == [0, 90]
+    assert [page.extract_text() for page in pages] == ["Hi", "Hi"]
+
+@pytest.mark.parametrize("method, args, rotations", [
+    ('rotate_pdf_pages', (1, 90), [180, 0]),
+    ('delete_pdf_pages', (2,), [90]),
+    ('insert_into_pdf', (None, 2, 1), [0, 90, 0]),
+])
+def test_incremental_edit_with_output_naming_the_input(inherited_pdf, method, args, rotations):
+    pdf_operations = PDFOperations()
+    pdf_operations.select_pdf_files(str(inherited_pdf))
+    args = tuple(str(inherited_pdf) if arg is None else arg for arg in args)
+    original_size = inherited_pdf.stat().st_size
+    # A different spelling of the same path must still be recognized as the input
+    output = str(inherited_pdf.parent / "." / inherited_pdf.name)
+
+    bytes_appended = getattr(pdf_operations, method)(str(inherited_pdf), *args, output=output, incremental=True)
+
+    assert inherited_pdf.stat().st_size == original_size + bytes_appended
+    assert [page.rotation for page in PdfReader(inherited_pdf, strict=True).pages] == rotations